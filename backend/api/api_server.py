@@ -1,4 +1,5 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
@@ -6,19 +7,57 @@ import shap
 import joblib
 import json
 import sys
+import itertools
+import contextvars
+import time
+import threading
+import hmac
 from pathlib import Path
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Get the project root directory (2 levels up from backend/api/)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT / 'backend' / 'ml'))
 
+from coalescer import RequestCoalescer
+from columnar_data import load_columnar_company_data, read_company_data
+from customer_index import CustomerIndex
+from feature_encoder import FeatureEncoder
+from incremental_shap import IncrementalTreeShap
+from tree_ensemble import TreeEnsemble
+from fingerprint import file_fingerprint, combine_fingerprints
+from insights_cache import RegionalInsightsCache
+from regional_engine import GroupedShapAccumulator, StratifiedSample, sample_sizes, mean_interval, z_score
+import metrics as metrics_module
+import startup
+from result_cache import AnalysisCache
+from jobs import JobRunner, JobQueueFull, SUCCEEDED, FAILED
+from shap_store import ShapStore, used_feature_columns
+import typed_arrays
+
 app = Flask(__name__)
-CORS(app)  # Enable CORS for React frontend
+CORS(app, expose_headers=['X-Model-Version'])  # Enable CORS for React frontend
+
+# Per-stage latency histograms, exported at /api/metrics
+metrics = metrics_module.Metrics()
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing serialization as the 'json' stage."""
+    def dumps(self, obj, **kwargs):
+        with metrics.stage('json'):
+            return super().dumps(obj, **kwargs)
+
+app.json = TimedJSONProvider(app)
 
 # Configuration - use absolute paths from project root
 MODEL_FILENAME = str(PROJECT_ROOT / 'backend' / 'models' / 'churn_model.pkl')
+# Compiled copy of the model's trees for /api/score, exported by tree_ensemble.py
+TREE_ENSEMBLE_FILENAME = str(PROJECT_ROOT / 'backend' / 'models' / 'churn_model.trees.npz')
 COMPANY_DATA_FILENAME = str(PROJECT_ROOT / 'data' / 'company_data.csv')
+SHAP_STORE_DIR = str(PROJECT_ROOT / 'backend' / 'models' / 'shap_store')
+REGIONAL_CACHE_DIR = str(PROJECT_ROOT / 'backend' / 'models' / 'regional_insights_cache')
+COLUMNAR_DATA_DIR = str(PROJECT_ROOT / 'backend' / 'models' / 'company_data_columnar')
 
 CATEGORICAL_COLS = [
     'city', 'marital_status', 'acct_suspd_date', 'cust_orig_date',
@@ -27,156 +66,1186 @@ CATEGORICAL_COLS = [
 
 IDENTIFIER_COLS = ['individual_id', 'address_id']
 
+# Labels and earlier model outputs in the CSV: returned with customer rows, never model inputs
+LABEL_COLS = ['Churn', 'predicted_churn', 'predicted_churn_probability']
+
+# Upper bound on customers per /api/analyze/batch request
+MAX_BATCH_SIZE = 1000
+# Upper bound on customers per /api/score request; scoring skips SHAP, so far more fit
+MAX_SCORE_BATCH_SIZE = 100000
+# Streamed (NDJSON) batches hold only two chunks in memory at a time
+MAX_STREAM_BATCH_SIZE = 100000
+STREAM_CHUNK_SIZE = 256
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Opt-in micro-batching for /api/simulate: concurrent requests arriving within
+# the window are explained as one matrix. 0 disables it.
+SIMULATE_BATCH_WINDOW_MS = float(os.environ.get('SIMULATE_BATCH_WINDOW_MS', '0'))
+SIMULATE_MAX_BATCH_SIZE = int(os.environ.get('SIMULATE_MAX_BATCH_SIZE', '64'))
+
+# Results kept in the in-process analysis cache (repeat inputs, e.g. slider
+# values toggled back and forth). 0 disables it.
+ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', '2048'))
+
+# Seconds between checks of MODEL_FILENAME for a new model to hot-reload. 0 disables the watch.
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', '0'))
+# When set, POST /api/admin/reload-model requires it in the X-Admin-Token header
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+# Rows of company_data run through a reloaded model before it takes traffic
+RELOAD_WARMUP_ROWS = 8
+
+# Customers encoded and explained per block by compute_regional_insights; sets its peak memory
+REGIONAL_CHUNK_SIZE = int(os.environ.get('REGIONAL_CHUNK_SIZE', '4096'))
+
+# Customer segments reported by /api/regional-insights
+REGIONAL_GROUPING_COLS = ['Geographic_Cluster', 'Demographics_Cluster', 'Financial_Cluster', 'Policy_Behavioral_Cluster', 'state']
+
+# /api/regional-insights?mode=approx defaults: confidence interval half-width
+# targeted on each group's mean churn probability, and its confidence level
+REGIONAL_APPROX_TARGET_ERROR = 0.02
+REGIONAL_APPROX_CONFIDENCE = 0.95
+# Customers per group explained first to estimate the spread that sizes the sample
+REGIONAL_APPROX_PILOT_ROWS = 30
+REGIONAL_SAMPLE_SEED = 0
+
+# Background jobs (POST /api/jobs): worker threads, how long finished jobs and
+# their results are kept, and how many may be queued or running at once
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_RETENTION_SECONDS = float(os.environ.get('JOB_RETENTION_SECONDS', '3600'))
+JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', '16'))
+# Finished jobs kept at once (oldest dropped first), and how long a downloaded result stays available
+JOB_MAX_RETAINED = int(os.environ.get('JOB_MAX_RETAINED', '64'))
+JOB_FETCHED_RETENTION_SECONDS = float(os.environ.get('JOB_FETCHED_RETENTION_SECONDS', '60'))
+
+# Upper bound on grid points per /api/simulate/sweep request (e.g. 50 x 50)
+MAX_SWEEP_POINTS = 2500
+MAX_SWEEP_TOP_K = 50
+
 # Global variables to store loaded model and data
 analyzer = None
 company_data = None
+customer_index = None
+company_data_fingerprint = None
+regional_insights_cache = None
+simulate_coalescer = None
+# /api/score from the exported tree ensemble until the analyzer is published
+scorer = None
+
+# analyzer, regional_insights_cache and simulate_coalescer belong to one model
+# version: publish_model replaces them together under this lock, and each
+# request takes its own consistent snapshot of them when it starts
+model_lock = threading.Lock()
+# Held while a hot-reload is running; at most one at a time
+reload_lock = threading.Lock()
+model_reload_status = {"status": "idle"}
+
+# (company_data, overall sampler, {grouping column: sampler}) for mode=approx
+# regional insights; depends only on the data, so shared by every model version
+regional_sampling_frame = None
+regional_sampling_lock = threading.Lock()
+
+job_runner = JobRunner(
+    JOB_WORKERS, JOB_RETENTION_SECONDS, JOB_MAX_PENDING, JOB_MAX_RETAINED, JOB_FETCHED_RETENTION_SECONDS
+)
+
+# Loading stages run by initialize_analyzer, reported by /api/health
+startup_stages = startup.StartupStages(
+    ['model', 'company_data', 'explainer', 'shap_store', 'incremental_shap', 'tree_ensemble', 'analyzer']
+)
 
 class ShapDashboardAnalyzer:
     """Handles real-time SHAP analysis for customer churn prediction."""
-    def __init__(self, model, explainer, model_features):
+    def __init__(self, model, explainer, model_features, shap_store=None, incremental_shap=None,
+                 result_cache=None, explanation_cache=None, model_version=None, tree_ensemble=None):
         self.model = model
+        self.booster = model.get_booster()
+        self.tree_ensemble = tree_ensemble
+        self.model_version = model_version
         self.explainer = explainer
         self.model_features = model_features
+        self.shap_store = shap_store
+        self.incremental_shap = incremental_shap
+        self.result_cache = result_cache
+        self.explanation_cache = explanation_cache
+        self.encoder = FeatureEncoder(model_features, CATEGORICAL_COLS, IDENTIFIER_COLS)
+        
+        # Encoded column -> original feature, as names and as group indices
+        # (groups numbered in order of first appearance) for vectorized aggregation
+        self.original_features = [original_feature_name(name) for name in model_features]
+        self.group_names = list(dict.fromkeys(self.original_features))
+        group_ids = {name: g for g, name in enumerate(self.group_names)}
+        self.feature_groups = np.array([group_ids[name] for name in self.original_features], dtype=np.intp)
+        self.group_first_column = np.array([self.original_features.index(name) for name in self.group_names])
+        
+        # SHAP is zero for features no tree splits on; matrix responses leave them out
+        self.shap_columns = used_feature_columns(model, model_features)
 
-    def analyze_customer(self, customer_data):
-        """Analyze customer with provided data and return SHAP values."""
+    def encode_frame(self, df):
+        """One-hot encode raw customer rows and align them with the model features."""
+        # Remove identifier columns if present
+        df_features = df.drop(columns=[col for col in IDENTIFIER_COLS if col in df.columns], errors='ignore')
+        
+        # One-hot encode categorical columns
+        categorical_present = [col for col in CATEGORICAL_COLS if col in df_features.columns]
+        df_encoded = pd.get_dummies(df_features, columns=categorical_present)
+        
+        # Align with model features
+        return df_encoded.reindex(columns=self.model_features, fill_value=0)
+
+    def analyze_customer(self, customer_data, row_position=None):
+        """
+        Analyze customer with provided data and return SHAP values.
+        Known customers (row_position into company_data) are served from the
+        precomputed SHAP store when one is loaded.
+        """
         try:
-            # Preprocess the data
-            df = pd.DataFrame([customer_data])
-            
-            # Remove identifier columns if present
-            df_features = df.drop(columns=[col for col in IDENTIFIER_COLS if col in df.columns], errors='ignore')
-            
-            # One-hot encode categorical columns
-            categorical_present = [col for col in CATEGORICAL_COLS if col in df_features.columns]
-            df_encoded = pd.get_dummies(df_features, columns=categorical_present)
-            
-            # Align with model features
-            df_aligned = df_encoded.reindex(columns=self.model_features, fill_value=0)
+            # float64 so reported feature values match the raw input exactly;
+            # XGBoost and TreeSHAP cast to float32 internally either way
+            with metrics.stage('encode'):
+                features = self.encoder.encode(customer_data, dtype=np.float64)
             
-            # Get prediction
-            prediction_proba = self.model.predict_proba(df_aligned)[0]
-            churn_probability = float(prediction_proba[1])
+            cache_key, cached = self._cached(features[0], customer_data)
+            if cached is not None:
+                return cached
             
-            # Calculate SHAP values
-            shap_values = self.explainer.shap_values(df_aligned)
-            
-            # Format SHAP data
-            shap_data = []
-            for feature_name, shap_value in zip(df_aligned.columns, shap_values[0]):
-                # Extract original feature name (before one-hot encoding)
-                original_feature = feature_name
-                for cat_col in CATEGORICAL_COLS:
-                    if feature_name.startswith(cat_col):
-                        original_feature = cat_col
-                        break
+            if self.shap_store is not None and row_position is not None:
+                with metrics.stage('store_read'):
+                    prediction_proba = self.shap_store.prediction(row_position)
+                    shap_row = self.shap_store.shap_row(row_position)
+                    base_value = self.shap_store.base_value
+            else:
+                # Get prediction
+                with metrics.stage('predict_proba'):
+                    prediction_proba = self.model.predict_proba(features)[0]
                 
-                shap_data.append({
-                    "feature": feature_name,
-                    "original_feature": original_feature,
-                    "shap_value": float(shap_value),
-                    "feature_value": float(df_aligned[feature_name].iloc[0]),
-                    "impact": "increases_churn" if shap_value > 0 else "decreases_churn"
-                })
-            
-            # Sort by absolute SHAP value
-            shap_data_sorted = sorted(shap_data, key=lambda x: abs(x['shap_value']), reverse=True)
-            
-            # Aggregate by original feature
-            aggregated_shap = {}
-            for item in shap_data:
-                orig_feat = item['original_feature']
-                if orig_feat not in aggregated_shap:
-                    aggregated_shap[orig_feat] = {
-                        "feature": orig_feat,
-                        "total_shap_value": 0,
-                        "impact": item['impact']
-                    }
-                aggregated_shap[orig_feat]['total_shap_value'] += item['shap_value']
+                # Calculate SHAP values
+                with metrics.stage('shap_values'):
+                    shap_row = self.explainer.shap_values(features)[0]
+                base_value = float(self.explainer.expected_value)
             
-            aggregated_list = sorted(
-                aggregated_shap.values(),
-                key=lambda x: abs(x['total_shap_value']),
-                reverse=True
-            )
+            with metrics.stage('postprocess'):
+                result = self._format_analysis(customer_data, prediction_proba, shap_row, base_value, features[0])
+            return self._remember(cache_key, result)
             
+        except Exception as e:
             return {
-                "success": True,
-                "customer_id": customer_data.get('individual_id', 'New Customer'),
-                "prediction": {
-                    "churn_probability": churn_probability,
-                    "will_churn": churn_probability > 0.5,
-                    "confidence": float(max(prediction_proba[0], prediction_proba[1]))
-                },
-                "shap_analysis": {
-                    "base_value": float(self.explainer.expected_value),
-                    "top_features": shap_data_sorted[:15],
-                    "aggregated_features": aggregated_list[:10],
-                    "total_features_analyzed": len(shap_data)
+                "success": False,
+                "error": f"Error analyzing customer: {str(e)}"
+            }
+
+    def analyze_edit(self, customer_data, base_position, base_customer):
+        """
+        Analyze an edited copy of a known customer (e.g. a what-if simulation).
+        SHAP is recomputed only for the trees that split on an edited feature;
+        the base customer's per-tree contributions are cached by row position.
+        Returns (result, number of trees recomputed).
+        """
+        return self.analyze_edits([(customer_data, base_position, base_customer)])[0]
+
+    def analyze_edits(self, edits):
+        """
+        Vectorized analyze_edit for a list of (customer_data, base_position,
+        base_customer): predict_proba runs once for the batch, then SHAP is
+        recomputed per edit for the trees it affects. Returns one (result,
+        number of trees recomputed) per edit, in order.
+        """
+        n_features = len(self.model_features)
+        features = np.zeros((len(edits), n_features), dtype=np.float64)
+        base_features = np.zeros((len(edits), n_features), dtype=np.float32)
+        results = [None] * len(edits)
+        trees_recomputed = [0] * len(edits)
+        cache_keys = [None] * len(edits)
+        live = []
+        encode_start = time.perf_counter()
+        for i, (customer_data, _, base_customer) in enumerate(edits):
+            try:
+                self.encoder.encode_into(features[i], customer_data)
+                cache_keys[i], results[i] = self._cached(features[i], customer_data)
+                if results[i] is not None:
+                    continue
+                self.encoder.encode_into(base_features[i], base_customer)
+            except Exception as e:
+                results[i] = {
+                    "success": False,
+                    "error": f"Error analyzing customer: {str(e)}"
                 }
+                continue
+            live.append(i)
+        metrics.observe('encode', time.perf_counter() - encode_start)
+        
+        try:
+            if live:
+                with metrics.stage('predict_proba'):
+                    prediction_proba = self.model.predict_proba(features[live])
+                base_value = float(self.explainer.expected_value)
+                for j, i in enumerate(live):
+                    with metrics.stage('shap_values'):
+                        shap_row, trees_recomputed[i] = self.incremental_shap.explain_edit(
+                            features[i], edits[i][1], base_features[i]
+                        )
+                    with metrics.stage('postprocess'):
+                        results[i] = self._remember(cache_keys[i], self._format_analysis(
+                            edits[i][0], prediction_proba[j], shap_row, base_value, features[i]
+                        ))
+        except Exception as e:
+            error = {
+                "success": False,
+                "error": f"Error analyzing customer: {str(e)}"
             }
+            results = [r if r is not None else error for r in results]
+        
+        return list(zip(results, trees_recomputed))
+
+    def simulate_many(self, requests):
+        """
+        Batched /api/simulate. Each request is (customer_data, base_position,
+        base_customer); edits of a known customer (base_customer not None) go
+        through analyze_edits, the rest through analyze_customers. Returns one
+        (result, number of trees recomputed or None) per request, in order.
+        """
+        results = [None] * len(requests)
+        edits = [i for i, request in enumerate(requests) if request[2] is not None]
+        others = [i for i, request in enumerate(requests) if request[2] is None]
+        if edits:
+            for i, result in zip(edits, self.analyze_edits([requests[i] for i in edits])):
+                results[i] = result
+        if others:
+            for i, result in zip(others, self.analyze_customers([requests[i][0] for i in others])):
+                results[i] = (result, None)
+        return results
+
+    def analyze_customers(self, customers, row_positions=None):
+        """
+        Vectorized analyze_customer: encodes the batch into one matrix and runs
+        predict_proba and shap_values once. Returns one result per customer, in order;
+        a customer that fails to encode gets its own error result.
+        """
+        if row_positions is None:
+            row_positions = [None] * len(customers)
+        
+        features = np.zeros((len(customers), len(self.model_features)), dtype=np.float64)
+        results = [None] * len(customers)
+        cache_keys = [None] * len(customers)
+        live, stored = [], []
+        encode_start = time.perf_counter()
+        for i, customer_data in enumerate(customers):
+            try:
+                self.encoder.encode_into(features[i], customer_data)
+            except Exception as e:
+                results[i] = {
+                    "success": False,
+                    "error": f"Error analyzing customer: {str(e)}"
+                }
+                continue
+            cache_keys[i], results[i] = self._cached(features[i], customer_data)
+            if results[i] is not None:
+                continue
+            if self.shap_store is not None and row_positions[i] is not None:
+                stored.append(i)
+            else:
+                live.append(i)
+        metrics.observe('encode', time.perf_counter() - encode_start)
+        
+        try:
+            if live:
+                with metrics.stage('predict_proba'):
+                    prediction_proba = self.model.predict_proba(features[live])
+                with metrics.stage('shap_values'):
+                    shap_values = self.explainer.shap_values(features[live])
+                base_value = float(self.explainer.expected_value)
+                with metrics.stage('postprocess'):
+                    for j, i in enumerate(live):
+                        results[i] = self._remember(cache_keys[i], self._format_analysis(
+                            customers[i], prediction_proba[j], shap_values[j], base_value, features[i]
+                        ))
             
+            if stored:
+                with metrics.stage('postprocess'):
+                    for i in stored:
+                        position = row_positions[i]
+                        results[i] = self._remember(cache_keys[i], self._format_analysis(
+                            customers[i], self.shap_store.prediction(position), self.shap_store.shap_row(position),
+                            self.shap_store.base_value, features[i]
+                        ))
         except Exception as e:
-            return {
+            error = {
                 "success": False,
-                "error": f"Error analyzing customer: {str(e)}"
+                "error": f"Error analyzing customers: {str(e)}"
             }
+            results = [r if r is not None else error for r in results]
+        
+        return results
 
-def initialize_analyzer():
-    """Initialize the SHAP analyzer on server startup."""
-    global analyzer, company_data
+    def explain_matrix(self, customers, row_positions=None):
+        """
+        Predictions and SHAP values for a batch as arrays, for binary responses.
+        Returns (churn probabilities (n,), SHAP values over self.shap_columns (n, k),
+        base value, {index: error}); both arrays are float32 and rows of customers
+        that failed to encode are NaN.
+        """
+        if row_positions is None:
+            row_positions = [None] * len(customers)
+        
+        n, k = len(customers), len(self.shap_columns)
+        churn_probability = np.full(n, np.nan, dtype=np.float32)
+        shap_values = np.full((n, k), np.nan, dtype=np.float32)
+        errors = {}
+        
+        features = np.zeros((n, len(self.model_features)), dtype=np.float32)
+        live, stored = [], []
+        with metrics.stage('encode'):
+            for i, customer_data in enumerate(customers):
+                try:
+                    self.encoder.encode_into(features[i], customer_data)
+                except Exception as e:
+                    errors[i] = f"Error analyzing customer: {str(e)}"
+                    continue
+                if self.shap_store is not None and row_positions[i] is not None:
+                    stored.append(i)
+                else:
+                    live.append(i)
+        
+        base_value = None
+        if stored:
+            positions = [row_positions[i] for i in stored]
+            with metrics.stage('store_read'):
+                churn_probability[stored] = self.shap_store.proba[positions, 1]
+                if np.array_equal(self.shap_store.columns, self.shap_columns):
+                    shap_values[stored] = self.shap_store.shap_values[positions]
+                else:
+                    shap_values[stored] = [self.shap_store.shap_row(p)[self.shap_columns] for p in positions]
+            base_value = self.shap_store.base_value
+        if live:
+            with metrics.stage('predict_proba'):
+                churn_probability[live] = self.model.predict_proba(features[live])[:, 1]
+            with metrics.stage('shap_values'):
+                shap_values[live] = self.explainer.shap_values(features[live])[:, self.shap_columns]
+            base_value = float(self.explainer.expected_value)
+        if base_value is None:
+            base_value = float(self.explainer.expected_value)
+        
+        return churn_probability, shap_values, base_value, errors
+
+    def score_customers(self, customers):
+        """
+        Churn probabilities only, without SHAP: the batch is encoded straight into
+        a float32 matrix and scored by the compiled tree ensemble, or with
+        XGBoost's in-place prediction when there is none; both skip the DataFrame
+        / DMatrix construction of predict_proba and give the same values.
+        Returns (churn probabilities (n,), {index: error}); rows of customers
+        that failed to encode are NaN.
+        """
+        if self.tree_ensemble is not None:
+            return encode_and_score(self.encoder, customers, self.tree_ensemble.predict)
+        return encode_and_score(self.encoder, customers, self.booster.inplace_predict)
+
+    def explain_rows(self, data, positions):
+        """
+        Churn probabilities (n,) and SHAP values over self.shap_columns (n, k)
+        for the rows of `data` (company_data) at sorted `positions`, read from
+        the SHAP store when one is loaded.
+        """
+        if self.shap_store is not None:
+            with metrics.stage('store_read'):
+                churn_probability = self.shap_store.proba[positions, 1]
+                if np.array_equal(self.shap_store.columns, self.shap_columns):
+                    shap_values = self.shap_store.shap_values[positions]
+                else:
+                    shap_values = np.array([self.shap_store.shap_row(p)[self.shap_columns] for p in positions])
+            return churn_probability, shap_values
+        
+        with metrics.stage('encode'):
+            features = self.encode_frame(data.iloc[positions]).to_numpy(dtype=np.float32)
+        with metrics.stage('predict_proba'):
+            churn_probability = self.model.predict_proba(features)[:, 1]
+        with metrics.stage('shap_values'):
+            shap_values = self.explainer.shap_values(features)[:, self.shap_columns]
+        return churn_probability, shap_values
+
+    def explain_customer(self, customer_data, row_position=None):
+        """
+        Churn probability and every non-zero SHAP contribution, sorted by
+        absolute value, for one customer (the /api/shap response). Read from the
+        SHAP store for known customers and memoized in the explanation cache.
+        """
+        with metrics.stage('encode'):
+            features = self.encoder.encode(customer_data, dtype=np.float64)
+        customer_id = customer_data.get('individual_id', 'New Customer')
+        
+        cache_key = None
+        if self.explanation_cache is not None:
+            cache_key = self.explanation_cache.key(features[0])
+            cached = self.explanation_cache.get(cache_key, customer_id)
+            if cached is not None:
+                return cached
+        
+        if self.shap_store is not None and row_position is not None:
+            with metrics.stage('store_read'):
+                prediction_proba = self.shap_store.prediction(row_position)
+                shap_row = self.shap_store.shap_row(row_position)
+                base_value = self.shap_store.base_value
+        else:
+            with metrics.stage('predict_proba'):
+                prediction_proba = self.model.predict_proba(features)[0]
+            with metrics.stage('shap_values'):
+                shap_row = self.explainer.shap_values(features)[0]
+            base_value = float(self.explainer.expected_value)
+        
+        postprocess_start = time.perf_counter()
+        nonzero = np.flatnonzero(shap_row)
+        order = nonzero[np.argsort(-np.abs(shap_row[nonzero]), kind='stable')]
+        result = {
+            "success": True,
+            "customer_id": customer_id,
+            "churn_probability": float(prediction_proba[1]),
+            "base_value": base_value,
+            "shap_values": [{
+                "feature": self.model_features[j],
+                "original_feature": self.original_features[j],
+                "shap_value": float(shap_row[j]),
+                "feature_value": float(features[0, j])
+            } for j in order]
+        }
+        metrics.observe('postprocess', time.perf_counter() - postprocess_start)
+        
+        if cache_key is not None:
+            self.explanation_cache.put(cache_key, result)
+        return result
+
+    def analyze_sweep(self, customer_data, grid, top_k=5):
+        """
+        Analyze a customer at every point of a value grid ({field: [values, ...]},
+        one field for a curve, several for a cartesian grid). All variants are
+        encoded as one matrix and explained with a single predict_proba /
+        shap_values pass. Points are in row-major order over the grid fields.
+        """
+        fields = list(grid)
+        points = list(itertools.product(*(grid[field] for field in fields)))
+        
+        with metrics.stage('encode'):
+            features = np.repeat(self.encoder.encode(customer_data, dtype=np.float64), len(points), axis=0)
+            for j, field in enumerate(fields):
+                self.encoder.assign(features, field, [point[j] for point in points])
+        
+        with metrics.stage('predict_proba'):
+            churn_probability = self.model.predict_proba(features)[:, 1]
+        with metrics.stage('shap_values'):
+            shap_values = self.explainer.shap_values(features)
+        base_value = float(self.explainer.expected_value)
+        postprocess_start = time.perf_counter()
+        
+        # Stable sort keeps ties in feature order, as in _format_analysis
+        top = np.argsort(-np.abs(shap_values), axis=1, kind='stable')[:, :top_k]
+        
+        results = []
+        for i, point in enumerate(points):
+            results.append({
+                "values": dict(zip(fields, point)),
+                "churn_probability": float(churn_probability[i]),
+                "top_features": [{
+                    "feature": self.model_features[j],
+                    "original_feature": self.original_features[j],
+                    "shap_value": float(shap_values[i, j])
+                } for j in top[i]]
+            })
+        metrics.observe('postprocess', time.perf_counter() - postprocess_start)
+        
+        shape = [len(grid[field]) for field in fields]
+        return {
+            "success": True,
+            "customer_id": customer_data.get('individual_id', 'New Customer'),
+            "features": fields,
+            "shape": shape,
+            "base_value": base_value,
+            "churn_probability": churn_probability.reshape(shape).tolist(),
+            "points": results
+        }
+
+    def _cached(self, feature_row, customer_data):
+        """Return (cache key, cached result or None); (None, None) without a result cache."""
+        if self.result_cache is None:
+            return None, None
+        key = self.result_cache.key(feature_row)
+        return key, self.result_cache.get(key, customer_data.get('individual_id', 'New Customer'))
+
+    def _remember(self, cache_key, result):
+        if cache_key is not None:
+            self.result_cache.put(cache_key, result)
+        return result
+
+    def _format_analysis(self, customer_data, prediction_proba, shap_row, base_value, feature_row):
+        """Build the API response for one customer from its prediction and SHAP row."""
+        churn_probability = float(prediction_proba[1])
+        shap_row = np.asarray(shap_row)
+        
+        # Only the top features are turned into dicts
+        top_features = [{
+            "feature": self.model_features[j],
+            "original_feature": self.original_features[j],
+            "shap_value": float(shap_row[j]),
+            "feature_value": float(feature_row[j]),
+            "impact": "increases_churn" if shap_row[j] > 0 else "decreases_churn"
+        } for j in top_k_by_magnitude(shap_row, 15)]
+        
+        # Aggregate by original feature. bincount adds the weights one by one in
+        # column order, so totals are exactly the sequential float sums; a group's
+        # impact is that of its first column.
+        totals = np.bincount(
+            self.feature_groups, weights=shap_row.astype(np.float64), minlength=len(self.group_names)
+        )
+        aggregated_features = [{
+            "feature": self.group_names[g],
+            "total_shap_value": float(totals[g]),
+            "impact": "increases_churn" if shap_row[self.group_first_column[g]] > 0 else "decreases_churn"
+        } for g in top_k_by_magnitude(totals, 10)]
+        
+        return {
+            "success": True,
+            "customer_id": customer_data.get('individual_id', 'New Customer'),
+            "prediction": {
+                "churn_probability": churn_probability,
+                "will_churn": churn_probability > 0.5,
+                "confidence": float(max(prediction_proba[0], prediction_proba[1]))
+            },
+            "shap_analysis": {
+                "base_value": base_value,
+                "top_features": top_features,
+                "aggregated_features": aggregated_features,
+                "total_features_analyzed": len(self.model_features)
+            }
+        }
+
+def top_k_by_magnitude(values, k):
+    """
+    Indices of the k largest |values|, largest first, with ties in index order
+    (the order a stable sort by absolute value gives). argpartition finds the
+    k-th largest magnitude so only the candidates are sorted.
+    """
+    magnitude = np.abs(values)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(magnitude):
+        kth = magnitude[np.argpartition(-magnitude, k - 1)[k - 1]]
+        above = np.flatnonzero(magnitude > kth)
+        tied = np.flatnonzero(magnitude == kth)[:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(len(magnitude))
+    return candidates[np.lexsort((candidates, -magnitude[candidates]))]
+
+class EnsembleScorer:
+    """
+    /api/score while the analyzer is still loading: the exported tree ensemble
+    and an encoder built from its feature names, without the XGBoost model.
+    """
+    def __init__(self, tree_ensemble, model_version):
+        self.tree_ensemble = tree_ensemble
+        self.model_version = model_version
+        self.model_features = tree_ensemble.feature_names
+        self.encoder = FeatureEncoder(self.model_features, CATEGORICAL_COLS, IDENTIFIER_COLS)
+    
+    def score_customers(self, customers):
+        """Same as ShapDashboardAnalyzer.score_customers."""
+        return encode_and_score(self.encoder, customers, self.tree_ensemble.predict)
+
+def encode_and_score(encoder, customers, predict):
+    """
+    Encode customers straight into a float32 matrix and score it with
+    predict(matrix) -> churn probabilities. Returns (churn probabilities (n,),
+    {index: error}); rows of customers that failed to encode are NaN.
+    """
+    features = np.zeros((len(customers), encoder.n_features), dtype=np.float32)
+    errors = {}
+    with metrics.stage('encode'):
+        for i, customer_data in enumerate(customers):
+            try:
+                encoder.encode_into(features[i], customer_data)
+            except Exception as e:
+                errors[i] = f"Error scoring customer: {str(e)}"
+    
+    with metrics.stage('predict'):
+        churn_probability = predict(features)
+    churn_probability[list(errors)] = np.nan
+    return churn_probability, errors
+
+def original_feature_name(feature_name):
+    """Name of the raw field an encoded (possibly one-hot) model feature comes from."""
+    for cat_col in CATEGORICAL_COLS:
+        # pd.get_dummies names one-hot columns '<column>_<value>'
+        if feature_name.startswith(cat_col + '_'):
+            return cat_col
+    return feature_name
+
+def initialize_analyzer(columnar_data=False):
+    """
+    Initialize the SHAP analyzer on server startup.
+    With columnar_data=True, company_data is served from a memory-mapped columnar
+    copy of the CSV (see columnar_data.py) instead of a heap-allocated DataFrame.
+    
+    Independent stages run in parallel (the model and the CSV load side by side;
+    the explainer and the SHAP store each start as soon as their inputs are in),
+    and each stage's timing is recorded in startup_stages. Globals are published
+    as they become usable - /api/score works as soon as an exported tree
+    ensemble is loaded, customer lookups once the data is loaded - with the
+    analyzer last, so a request never sees it half-initialized.
+    """
+    global company_data, customer_index, company_data_fingerprint
     
     print("🔄 Loading model and data...")
+    startup_stages.reset()
     try:
-        model = joblib.load(MODEL_FILENAME)
-        
-        # Load company data CSV
-        if not Path(COMPANY_DATA_FILENAME).exists():
-            raise FileNotFoundError(f"Company data file not found: {COMPANY_DATA_FILENAME}")
-        
-        print(f"📂 Loading data from: {COMPANY_DATA_FILENAME}")
-        company_data = pd.read_csv(COMPANY_DATA_FILENAME)
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix='startup') as pool:
+            model_future = pool.submit(load_model_stage)
+            data_future = pool.submit(load_company_data_stage, columnar_data)
+            ensemble_future = pool.submit(build_tree_ensemble_stage, model_future, data_future)
+            
+            model, model_fingerprint = model_future.result()
+            explainer_future = pool.submit(build_explainer_stage, model)
+            
+            data, index, data_fingerprint = data_future.result()
+            company_data, customer_index, company_data_fingerprint = data, index, data_fingerprint
+            store_future = pool.submit(open_shap_store_stage, model_fingerprint, data_fingerprint, len(data))
+            
+            explainer = explainer_future.result()
+            model_features = model.get_booster().feature_names
+            incremental_future = pool.submit(
+                build_incremental_shap_stage, model, explainer, model_features, data
+            )
+            shap_store = store_future.result()
+            incremental_shap = incremental_future.result()
+            tree_ensemble, ensemble_fingerprint = ensemble_future.result()
+            if ensemble_fingerprint != model_fingerprint:
+                # The model file changed between the two reads
+                tree_ensemble = build_tree_ensemble(model, model_fingerprint, data)
         
-        print("🔄 Initializing SHAP explainer...")
-        explainer = shap.TreeExplainer(model)
-        model_features = model.get_booster().feature_names
+        with startup_stages.stage('analyzer'):
+            publish_model(build_analyzer(
+                model, model_fingerprint, explainer, model_features, shap_store, incremental_shap, tree_ensemble
+            ))
         
-        analyzer = ShapDashboardAnalyzer(model, explainer, model_features)
-        print("✅ SHAP Analyzer initialized successfully!")
+        print(f"✅ SHAP Analyzer initialized successfully in {startup_stages.finish():.2f}s!")
         print(f"📊 Loaded {len(company_data)} customers from database")
+        print(f"🔑 Indexed {len(customer_index)} customer IDs")
         
     except FileNotFoundError as e:
+        startup_stages.finish()
         print(f"❌ Error: Could not find required file: {e}")
         print("⚠️  Server will start but SHAP analysis will not be available.")
     except Exception as e:
+        startup_stages.finish()
         print(f"❌ Error initializing analyzer: {e}")
         print("⚠️  Server will start but SHAP analysis will not be available.")
 
+def start_background_initialization(columnar_data=False):
+    """
+    Run initialize_analyzer on a daemon thread and return immediately, so the
+    HTTP listener comes up (and answers /api/health) while the model loads.
+    The model file watch (MODEL_WATCH_INTERVAL) starts once it has loaded.
+    """
+    def run():
+        initialize_analyzer(columnar_data=columnar_data)
+        start_model_watcher()
+    
+    thread = threading.Thread(target=run, name='startup', daemon=True)
+    thread.start()
+    return thread
+
+def build_analyzer(model, model_fingerprint, explainer, model_features, shap_store, incremental_shap,
+                   tree_ensemble=None):
+    """ShapDashboardAnalyzer for one model version, with its own result caches."""
+    result_cache, explanation_cache = None, None
+    if ANALYSIS_CACHE_SIZE > 0:
+        result_cache = AnalysisCache(ANALYSIS_CACHE_SIZE, model_fingerprint)
+        explanation_cache = AnalysisCache(ANALYSIS_CACHE_SIZE, model_fingerprint)
+    
+    return ShapDashboardAnalyzer(
+        model, explainer, model_features, shap_store, incremental_shap, result_cache, explanation_cache,
+        model_version=model_fingerprint, tree_ensemble=tree_ensemble
+    )
+
+def publish_scorer(new_scorer):
+    """Serve /api/score from new_scorer until an analyzer is published."""
+    global scorer
+    with model_lock:
+        if analyzer is None:
+            scorer = new_scorer
+
+def publish_model(new_analyzer):
+    """
+    Make new_analyzer, with a regional insights cache and simulate coalescer of
+    its own, the model version new requests are served by. Requests already
+    running keep the version they started with; the previous coalescer answers
+    what it has queued and then stops.
+    """
+    global analyzer, regional_insights_cache, simulate_coalescer, scorer
+    
+    new_regional_cache = RegionalInsightsCache(
+        REGIONAL_CACHE_DIR, combine_fingerprints(new_analyzer.model_version, company_data_fingerprint)
+    )
+    new_coalescer = None
+    if SIMULATE_BATCH_WINDOW_MS > 0:
+        new_coalescer = RequestCoalescer(
+            metrics.bind('/api/simulate', new_analyzer.simulate_many),
+            window_ms=SIMULATE_BATCH_WINDOW_MS,
+            max_batch_size=SIMULATE_MAX_BATCH_SIZE,
+            error_result=lambda error: (error, None)
+        )
+        print(f"🧺 Coalescing /api/simulate requests ({SIMULATE_BATCH_WINDOW_MS} ms window, "
+              f"max batch {SIMULATE_MAX_BATCH_SIZE})")
+    
+    with model_lock:
+        previous_coalescer = simulate_coalescer
+        analyzer, regional_insights_cache, simulate_coalescer = new_analyzer, new_regional_cache, new_coalescer
+        # The analyzer scores from now on
+        scorer = None
+    
+    if previous_coalescer is not None:
+        previous_coalescer.close()
+
+def reload_model():
+    """
+    Hot-reload MODEL_FILENAME: load the model and explainer alongside the one
+    being served, warm them on a few rows of company_data, then publish_model.
+    company_data is reused as loaded. Returns the new status dict; on any
+    failure the current model keeps serving.
+    """
+    if not reload_lock.acquire(blocking=False):
+        return {**model_reload_status}
+    try:
+        current = analyzer
+        started = time.perf_counter()
+        model_reload_status.clear()
+        model_reload_status.update({"status": "loading", "previous_version": current.model_version})
+        print(f"🔄 Reloading model from {MODEL_FILENAME}...")
+        try:
+            model_fingerprint = file_fingerprint(MODEL_FILENAME)
+            if model_fingerprint == current.model_version:
+                model_reload_status.update({"status": "unchanged", "model_version": model_fingerprint})
+                print("ℹ️  Model file unchanged; keeping the current model.")
+                return {**model_reload_status}
+            
+            model = joblib.load(MODEL_FILENAME)
+            explainer = shap.TreeExplainer(model)
+            model_features = model.get_booster().feature_names
+            shap_store = ShapStore.open(
+                SHAP_STORE_DIR,
+                model_fingerprint=model_fingerprint,
+                data_fingerprint=company_data_fingerprint,
+                n_rows=len(company_data)
+            )
+            incremental_shap = build_incremental_shap(model, explainer, model_features, company_data)
+            tree_ensemble = build_tree_ensemble(model, model_fingerprint, company_data)
+            new_analyzer = build_analyzer(
+                model, model_fingerprint, explainer, model_features, shap_store, incremental_shap, tree_ensemble
+            )
+            
+            # First calls pay one-off costs (lazy allocations, JIT); keep them off live traffic
+            warmup = new_analyzer.analyze_customers(company_data.head(RELOAD_WARMUP_ROWS).to_dict('records'))
+            failed = [result['error'] for result in warmup if not result.get('success', False)]
+            if failed:
+                raise ValueError(f"warmup failed: {failed[0]}")
+            
+            publish_model(new_analyzer)
+        except Exception as e:
+            model_reload_status.update({"status": "failed", "error": str(e)})
+            print(f"❌ Model reload failed, still serving {current.model_version}: {e}")
+            return {**model_reload_status}
+        
+        seconds = time.perf_counter() - started
+        model_reload_status.update({
+            "status": "reloaded", "model_version": model_fingerprint, "seconds": round(seconds, 3)
+        })
+        print(f"✅ Now serving model {model_fingerprint} (reloaded in {seconds:.2f}s)")
+        return {**model_reload_status}
+    finally:
+        reload_lock.release()
+
+def start_model_watcher(interval=None):
+    """
+    Poll MODEL_FILENAME every `interval` seconds (default MODEL_WATCH_INTERVAL)
+    and hot-reload it when it changes. Returns the watcher thread, or None when
+    watching is disabled.
+    """
+    interval = MODEL_WATCH_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return None
+    
+    def model_file_state():
+        try:
+            stat = os.stat(MODEL_FILENAME)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def watch():
+        last = model_file_state()
+        while True:
+            time.sleep(interval)
+            state = model_file_state()
+            if state is None or state == last:
+                continue
+            # A file still being written keeps changing; wait until it settles
+            time.sleep(interval)
+            if model_file_state() != state:
+                continue
+            last = state
+            if analyzer is not None:
+                reload_model()
+    
+    thread = threading.Thread(target=watch, name='model-watcher', daemon=True)
+    thread.start()
+    print(f"👀 Watching {MODEL_FILENAME} for model updates every {interval:g}s")
+    return thread
+
+def load_model_stage():
+    """Unpickle the model; returns (model, model fingerprint)."""
+    with startup_stages.stage('model'):
+        return joblib.load(MODEL_FILENAME), file_fingerprint(MODEL_FILENAME)
+
+def load_company_data_stage(columnar_data):
+    """Load company_data and index its customer IDs; returns (data, index, data fingerprint)."""
+    with startup_stages.stage('company_data'):
+        # Load company data CSV
+        if not Path(COMPANY_DATA_FILENAME).exists():
+            raise FileNotFoundError(f"Company data file not found: {COMPANY_DATA_FILENAME}")
+        
+        data_fingerprint = file_fingerprint(COMPANY_DATA_FILENAME)
+        
+        print(f"📂 Loading data from: {COMPANY_DATA_FILENAME}")
+        if columnar_data:
+            data = load_columnar_company_data(COMPANY_DATA_FILENAME, COLUMNAR_DATA_DIR, data_fingerprint)
+        else:
+            data = read_company_data(COMPANY_DATA_FILENAME)
+        print(f"🗜️  company_data: {data.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory")
+        return data, CustomerIndex(data['individual_id']), data_fingerprint
+
+def build_explainer_stage(model):
+    with startup_stages.stage('explainer'):
+        print("🔄 Initializing SHAP explainer...")
+        return shap.TreeExplainer(model)
+
+def open_shap_store_stage(model_fingerprint, data_fingerprint, n_rows):
+    with startup_stages.stage('shap_store'):
+        return ShapStore.open(
+            SHAP_STORE_DIR,
+            model_fingerprint=model_fingerprint,
+            data_fingerprint=data_fingerprint,
+            n_rows=n_rows
+        )
+
+def build_incremental_shap_stage(model, explainer, model_features, data):
+    with startup_stages.stage('incremental_shap'):
+        return build_incremental_shap(model, explainer, model_features, data)
+
+def build_incremental_shap(model, explainer, model_features, data, n_check=32):
+    """
+    Set up incremental SHAP for /api/simulate, after checking that it matches
+    the TreeExplainer exactly on the first rows of company_data. Returns None
+    (full TreeExplainer path) if the model is unsupported or the check fails.
+    """
+    try:
+        incremental_shap = IncrementalTreeShap(model.get_booster())
+        encoder = FeatureEncoder(model_features, CATEGORICAL_COLS, IDENTIFIER_COLS)
+        sample = encoder.encode_many(data.head(n_check).to_dict('records'))
+        if not incremental_shap.verify(explainer, sample):
+            print("⚠️  Incremental SHAP does not match the TreeExplainer; simulations use the full path.")
+            return None
+    except Exception as e:
+        print(f"⚠️  Incremental SHAP unavailable ({e}); simulations use the full path.")
+        return None
+    print(f"🌲 Incremental SHAP ready ({incremental_shap.n_trees} trees, "
+          f"{len(incremental_shap.used_features)} split features)")
+    return incremental_shap
+
+def build_tree_ensemble_stage(model_future, data_future):
+    """
+    Load the exported tree ensemble for the model file and publish it for
+    /api/score right away, without waiting for the pickled model. With no
+    export for this model, compile one once the model and data are in.
+    Returns (tree ensemble or None, fingerprint of the model file it is for).
+    """
+    with startup_stages.stage('tree_ensemble'):
+        model_fingerprint = file_fingerprint(MODEL_FILENAME)
+        tree_ensemble = load_exported_tree_ensemble(model_fingerprint)
+        if tree_ensemble is not None:
+            # Load the compiled kernels here rather than in the first request
+            tree_ensemble.predict(np.zeros((1, tree_ensemble.n_features), dtype=np.float32))
+            publish_scorer(EnsembleScorer(tree_ensemble, model_fingerprint))
+            return tree_ensemble, model_fingerprint
+        model, model_fingerprint = model_future.result()
+        data = data_future.result()[0]
+        return compile_tree_ensemble(model, data), model_fingerprint
+
+def build_tree_ensemble(model, model_fingerprint, data):
+    """Exported tree ensemble for this model if there is one, otherwise compiled from the booster."""
+    tree_ensemble = load_exported_tree_ensemble(model_fingerprint)
+    if tree_ensemble is not None:
+        return tree_ensemble
+    return compile_tree_ensemble(model, data)
+
+def load_exported_tree_ensemble(model_fingerprint):
+    """
+    TREE_ENSEMBLE_FILENAME if it was exported from the model with this
+    fingerprint, else None. Exports are checked against predict_proba when
+    written, so they are used as they are.
+    """
+    if not Path(TREE_ENSEMBLE_FILENAME).exists():
+        return None
+    try:
+        tree_ensemble = TreeEnsemble.load(TREE_ENSEMBLE_FILENAME, model_fingerprint=model_fingerprint)
+    except Exception as e:
+        print(f"⚠️  Could not read {TREE_ENSEMBLE_FILENAME} ({e}); compiling the model's trees instead.")
+        return None
+    if tree_ensemble is None or tree_ensemble.feature_names is None:
+        print(f"⚠️  {TREE_ENSEMBLE_FILENAME} was exported from a different model or format version; compiling the model's trees instead.")
+        print("   Re-export it with: python backend/api/tree_ensemble.py")
+        return None
+    print(f"🌳 Loaded exported tree ensemble ({tree_ensemble.n_trees} trees, {len(tree_ensemble.left)} nodes)")
+    return tree_ensemble
+
+def compile_tree_ensemble(model, data, n_check=256):
+    """
+    Compile the booster's trees for /api/score and check them against
+    predict_proba on the first rows of company_data; returns None (XGBoost
+    in-place prediction) if the model is unsupported or the check fails.
+    """
+    try:
+        tree_ensemble = TreeEnsemble.from_model(model)
+        encoder = FeatureEncoder(model.get_booster().feature_names, CATEGORICAL_COLS, IDENTIFIER_COLS)
+        sample = encoder.encode_many(data.head(n_check).to_dict('records'))
+        if not tree_ensemble.verify(model, sample):
+            print("⚠️  Compiled tree ensemble does not match predict_proba; scoring uses XGBoost.")
+            return None
+    except Exception as e:
+        print(f"⚠️  Compiled tree ensemble unavailable ({e}); scoring uses XGBoost.")
+        return None
+    print(f"🌳 Compiled tree ensemble ready ({tree_ensemble.n_trees} trees, {len(tree_ensemble.left)} nodes)")
+    return tree_ensemble
+
+def column_equals(column, value):
+    """Boolean mask of rows whose value, as a string, is `value`."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Compare the few categories, not every row's string
+        codes = column.cat.codes.to_numpy()
+        mask = np.isin(codes, np.flatnonzero(column.cat.categories.astype(str) == value))
+        if value == 'nan':
+            mask |= codes == -1
+        return mask
+    return (column.astype(str) == value).to_numpy()
+
+def lookup_customer(customer_id):
+    """Return (row position, row dict) for a customer in company_data, or (None, None) if not found."""
+    with metrics.stage('lookup'):
+        position = customer_index.get(customer_id)
+        if position is None:
+            return None, None
+        return position, company_data.iloc[position].to_dict()
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    g.metrics_start = time.perf_counter()
+    metrics.set_endpoint(g.metrics_endpoint)
+    metrics.request_started(g.metrics_endpoint)
+
+@app.before_request
+def pin_model_version():
+    # The whole request, including a streamed body, is served by the model
+    # version current when it started, even if a hot-reload swaps it meanwhile
+    with model_lock:
+        g.analyzer = analyzer
+        g.scorer = analyzer if analyzer is not None else scorer
+        g.regional_insights_cache = regional_insights_cache
+        g.simulate_coalescer = simulate_coalescer
+
+@app.after_request
+def add_model_version_header(response):
+    if g.get('scorer') is not None:
+        response.headers['X-Model-Version'] = g.scorer.model_version
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc=None):
+    # Streamed responses are finished by their generator once the body is sent
+    if not g.get('metrics_streaming'):
+        record_request_metrics()
+
+def record_request_metrics():
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        metrics.request_finished(g.metrics_endpoint, time.perf_counter() - start)
+        metrics.clear_endpoint()
+
+def cache_metric_families():
+    """Cache and coalescer counters as extra Prometheus metric families."""
+    caches = {}
+    if analyzer is not None:
+        if analyzer.result_cache is not None:
+            caches['analysis'] = analyzer.result_cache.stats()
+        if analyzer.explanation_cache is not None:
+            caches['explanation'] = analyzer.explanation_cache.stats()
+        if analyzer.incremental_shap is not None:
+            stats = analyzer.incremental_shap.stats()
+            lookups = stats['hits'] + stats['misses']
+            caches['incremental_shap_base'] = {
+                "entries": stats['cached_customers'],
+                "hits": stats['hits'],
+                "misses": stats['misses'],
+                "hit_rate": stats['hits'] / lookups if lookups else 0.0
+            }
+    
+    families = [
+        ("cache_hits_total", "counter", "Cache lookups that hit",
+         [({"cache": name}, s['hits']) for name, s in caches.items()]),
+        ("cache_misses_total", "counter", "Cache lookups that missed",
+         [({"cache": name}, s['misses']) for name, s in caches.items()]),
+        ("cache_hit_ratio", "gauge", "Share of cache lookups that hit",
+         [({"cache": name}, float(s['hit_rate'])) for name, s in caches.items()]),
+        ("cache_entries", "gauge", "Entries currently cached",
+         [({"cache": name}, s['entries']) for name, s in caches.items()]),
+        ("analyzer_ready", "gauge", "1 once the model and data are loaded",
+         [({}, int(analyzer is not None))]),
+        ("model_info", "gauge", "Version (fingerprint) of the model being served",
+         [({"version": analyzer.model_version}, 1)] if analyzer is not None else []),
+        ("startup_stage_seconds", "gauge", "Time each startup stage took to load",
+         [({"stage": name}, float(stage['seconds']))
+          for name, stage in startup_stages.snapshot()['stages'].items() if stage['seconds'] is not None]),
+    ]
+    families.append(("jobs", "gauge", "Background jobs retained, by status",
+                     [({"status": status}, n) for status, n in job_runner.stats().items()]))
+    if simulate_coalescer is not None:
+        stats = simulate_coalescer.stats()
+        families.append(("coalescer_requests_total", "counter", "Requests served by the simulate coalescer (edits of known customers included)",
+                         [({}, stats['requests'])]))
+        families.append(("coalescer_batches_total", "counter", "Batches run by the simulate coalescer",
+                         [({}, stats['batches'])]))
+    return families
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Per-stage latency histograms, in-flight requests and cache hit rates in Prometheus text format."""
+    return Response(metrics.render(cache_metric_families()), content_type=metrics_module.CONTENT_TYPE)
+
+def health_status():
+    return {
+        "status": "ok",
+        "live": True,
+        "ready": analyzer is not None,
+        "analyzer_ready": analyzer is not None,
+        "scoring_ready": analyzer is not None or scorer is not None,
+        "model_version": analyzer.model_version if analyzer is not None else None,
+        "model_reload": {**model_reload_status},
+        "customers_loaded": len(company_data) if company_data is not None else 0,
+        "startup": startup_stages.snapshot(),
+        "result_cache": analyzer.result_cache.stats() if analyzer is not None and analyzer.result_cache else None
+    }
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
+    """
+    Health check endpoint. Always 200 while the process is serving (liveness);
+    'ready' and the per-stage 'startup' report whether the model and data are loaded.
+    """
+    return jsonify(health_status())
+
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: 200 as long as the server answers."""
+    return jsonify({"status": "ok", "live": True})
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once every startup stage has loaded, 503 until then."""
+    status = health_status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/api/admin/reload-model', methods=['POST'])
+def reload_model_endpoint():
+    """
+    Hot-reload MODEL_FILENAME without a restart (see reload_model). Returns 202
+    right away and reloads in the background, progress being reported as
+    'model_reload' in /api/health; with ?wait=1 it answers once the reload is done.
+    Requires the X-Admin-Token header when ADMIN_TOKEN is set.
+    """
+    if ADMIN_TOKEN and not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({
+            "error": "Invalid or missing X-Admin-Token header"
+        }), 403
+    
+    if analyzer is None:
+        return jsonify({
+            "error": "SHAP analyzer not initialized."
+        }), 503
+    
+    if reload_lock.locked():
+        return jsonify({
+            "error": "A model reload is already running",
+            "model_reload": {**model_reload_status}
+        }), 409
+    
+    if request.args.get('wait', '').lower() in ('1', 'true', 'yes'):
+        status = reload_model()
+        return jsonify(status), 500 if status['status'] == 'failed' else 200
+    
+    threading.Thread(target=reload_model, name='model-reload', daemon=True).start()
     return jsonify({
-        "status": "ok",
-        "analyzer_ready": analyzer is not None,
-        "customers_loaded": len(company_data) if company_data is not None else 0
-    })
+        "status": "reloading",
+        "model_version": analyzer.model_version
+    }), 202
 
 @app.route('/api/customer/<customer_id>', methods=['GET'])
 def get_customer_data(customer_id):
     """Get customer data by ID."""
-    if company_data is None:
+    if company_data is None or customer_index is None:
         return jsonify({
             "error": "Company data not loaded. Please check server logs."
         }), 503
     
-    customer = company_data[company_data['individual_id'] == customer_id]
+    _, customer = lookup_customer(customer_id)
     
-    if customer.empty:
+    if customer is None:
         return jsonify({
             "error": f"Customer ID '{customer_id}' not found in database."
         }), 404
     
-    return jsonify(customer.iloc[0].to_dict())
+    return jsonify(customer)
+
+@app.route('/api/shap/<customer_id>', methods=['GET'])
+def get_customer_shap(customer_id):
+    """
+    Churn probability and SHAP values, sorted by absolute impact, for a known customer.
+    Optional ?top=N returns only the N largest contributions.
+    """
+    analyzer = g.analyzer
+    if analyzer is None or customer_index is None:
+        return jsonify({
+            "error": "SHAP analyzer not initialized."
+        }), 503
+    
+    top = request.args.get('top', type=int)
+    if top is not None and top < 0:
+        return jsonify({
+            "error": "'top' must be a non-negative integer"
+        }), 400
+    
+    row_position, customer = lookup_customer(customer_id)
+    
+    if customer is None:
+        return jsonify({
+            "error": f"Customer ID '{customer_id}' not found in database."
+        }), 404
+    
+    try:
+        result = analyzer.explain_customer(customer, row_position)
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"Error explaining customer: {str(e)}"
+        }), 500
+    
+    if top is not None:
+        result = {**result, "shap_values": result['shap_values'][:top]}
+    return jsonify(result)
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_customer_endpoint():
@@ -186,6 +1255,7 @@ def analyze_customer_endpoint():
     1. Full customer data JSON
     2. Just customer_id to lookup from database
     """
+    analyzer = g.analyzer
     if analyzer is None:
         return jsonify({
             "error": "SHAP analyzer not initialized."
@@ -202,33 +1272,260 @@ def analyze_customer_endpoint():
     if 'customer_id' in request_data and len(request_data) == 1:
         customer_id = request_data['customer_id']
         
-        if company_data is None:
+        if company_data is None or customer_index is None:
             return jsonify({
                 "error": "Company data not loaded."
             }), 503
         
         # Lookup customer in database
-        customer = company_data[company_data['individual_id'] == customer_id]
+        row_position, customer_data_dict = lookup_customer(customer_id)
         
-        if customer.empty:
+        if customer_data_dict is None:
             return jsonify({
                 "error": f"Customer ID '{customer_id}' not found in database."
             }), 404
-        
-        # Get full customer data as dict
-        customer_data_dict = customer.iloc[0].to_dict()
     else:
         # Use provided customer data
+        row_position = None
         customer_data_dict = request_data
     
     # Analyze the customer
-    result = analyzer.analyze_customer(customer_data_dict)
+    result = analyzer.analyze_customer(customer_data_dict, row_position=row_position)
     
     if not result.get('success', False):
         return jsonify(result), 400
     
     return jsonify(result)
 
+def resolve_batch_items(items):
+    """
+    Turn batch request items into (customers, row_positions, errors).
+    Items are full customer records or customer IDs; unknown IDs get an entry in errors.
+    """
+    customers, row_positions, errors = [], [], {}
+    for i, item in enumerate(items):
+        if isinstance(item, dict) and not ('customer_id' in item and len(item) == 1):
+            customers.append(item)
+            row_positions.append(None)
+            continue
+        
+        customer_id = item['customer_id'] if isinstance(item, dict) else item
+        row_position, customer_data_dict = (None, None)
+        if customer_index is not None:
+            row_position, customer_data_dict = lookup_customer(customer_id)
+        if customer_index is None:
+            errors[i] = {
+                "success": False,
+                "error": "Customer data is still loading; try again shortly."
+            }
+        elif customer_data_dict is None:
+            errors[i] = {
+                "success": False,
+                "error": f"Customer ID '{customer_id}' not found in database."
+            }
+            customer_data_dict = {}
+        customers.append(customer_data_dict)
+        row_positions.append(row_position)
+    return customers, row_positions, errors
+
+def analyze_batch_slice(analyzer, customers, row_positions, errors, start, stop):
+    """Analyze customers[start:stop], keeping per-item errors in place."""
+    found = [i for i in range(start, stop) if i not in errors]
+    analyzed = analyzer.analyze_customers(
+        [customers[i] for i in found], [row_positions[i] for i in found]
+    )
+    results = [errors.get(i) for i in range(start, stop)]
+    for i, result in zip(found, analyzed):
+        results[i - start] = result
+    return results
+
+def response_format():
+    """
+    'json', 'ndjson' or 'typed' (typed_arrays frames) for a bulk endpoint:
+    ?format=..., ?stream=1 for NDJSON, or the best match for the Accept header.
+    """
+    requested = request.args.get('format', '').lower()
+    if requested in ('json', 'ndjson', 'typed'):
+        return requested
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return 'ndjson'
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE, typed_arrays.MIMETYPE])
+    return {NDJSON_MIMETYPE: 'ndjson', typed_arrays.MIMETYPE: 'typed'}.get(best, 'json')
+
+def stream_ndjson(n_items, analyze_chunk, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream per-customer results as newline-delimited JSON, one line per customer.
+    analyze_chunk(start, stop) returns the results for that range.
+    """
+    return stream_chunks(n_items, analyze_chunk, _ndjson_lines, NDJSON_MIMETYPE, chunk_size)
+
+def stream_typed_arrays(n_items, explain_chunk, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream results as typed_arrays frames, one per chunk. explain_chunk(start, stop)
+    returns (arrays, header metadata) for that range.
+    """
+    def frame(start, future):
+        arrays, meta = future.result()
+        return typed_arrays.encode_frame(arrays, dumps=app.json.dumps, start=start, **meta)
+    
+    return stream_chunks(n_items, explain_chunk, frame, typed_arrays.MIMETYPE, chunk_size)
+
+def stream_chunks(n_items, analyze_chunk, serialize, mimetype, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream a response chunk by chunk: analyze_chunk(start, stop) computes a range
+    and serialize(start, future) turns it into bytes/text. The next chunk is
+    explained on a worker thread while the current one is serialized and sent,
+    so at most two chunks are held in memory regardless of n_items.
+    """
+    g.metrics_streaming = True
+    endpoint = g.metrics_endpoint
+    
+    def generate():
+        metrics.set_endpoint(endpoint)
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pending = None
+                for start in range(0, n_items, chunk_size):
+                    # The copied context keeps the worker's stages labelled with this endpoint
+                    future = pool.submit(
+                        contextvars.copy_context().run, analyze_chunk, start, min(start + chunk_size, n_items)
+                    )
+                    if pending is not None:
+                        yield serialize(*pending)
+                    pending = (start, future)
+                if pending is not None:
+                    yield serialize(*pending)
+        finally:
+            record_request_metrics()
+    
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+def explain_batch_slice(analyzer, customers, row_positions, errors, start, stop):
+    """Typed-array counterpart of analyze_batch_slice: (arrays, header metadata) for customers[start:stop]."""
+    found = [i for i in range(start, stop) if i not in errors]
+    churn_probability, shap_values, base_value, failed = analyzer.explain_matrix(
+        [customers[i] for i in found], [row_positions[i] for i in found]
+    )
+    
+    rows = [i - start for i in found]
+    all_probability = np.full(stop - start, np.nan, dtype=np.float32)
+    all_shap = np.full((stop - start, len(analyzer.shap_columns)), np.nan, dtype=np.float32)
+    all_probability[rows] = churn_probability
+    all_shap[rows] = shap_values
+    
+    chunk_errors = {str(i - start): errors[i]['error'] for i in range(start, stop) if i in errors}
+    chunk_errors.update({str(rows[j]): message for j, message in failed.items()})
+    
+    arrays = {"churn_probability": all_probability, "shap_values": all_shap}
+    meta = {
+        "rows": stop - start,
+        "customer_ids": [customers[i].get('individual_id') for i in range(start, stop)],
+        "errors": chunk_errors,
+        "base_value": base_value,
+        "features": [analyzer.model_features[j] for j in analyzer.shap_columns]
+    }
+    return arrays, meta
+
+def _ndjson_lines(start, future):
+    lines = []
+    for offset, result in enumerate(future.result()):
+        lines.append(app.json.dumps({"index": start + offset, **result}))
+    return "\n".join(lines) + "\n"
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch_endpoint():
+    """
+    Analyze many customers in one request.
+    Body: {"customers": [...]} where each item is either
+    1. Full customer data JSON
+    2. A customer_id (string/number, or {"customer_id": ...}) to lookup from database
+    Returns one result per item, in order. With `Accept: application/x-ndjson`
+    (or ?stream=1) results are streamed one JSON line per customer; with
+    `Accept: application/vnd.churn.typed-arrays` (or ?format=typed) predictions
+    and SHAP matrices are streamed as binary typed-array frames (see typed_arrays.py).
+    """
+    analyzer = g.analyzer
+    if analyzer is None:
+        return jsonify({
+            "error": "SHAP analyzer not initialized."
+        }), 503
+    
+    request_data = request.json
+    items = request_data.get('customers') if isinstance(request_data, dict) else request_data
+    
+    if not items or not isinstance(items, list):
+        return jsonify({
+            "error": "Provide a non-empty 'customers' list"
+        }), 400
+    
+    output = response_format()
+    limit = MAX_STREAM_BATCH_SIZE if output != 'json' else MAX_BATCH_SIZE
+    if len(items) > limit:
+        return jsonify({
+            "error": f"Batch of {len(items)} customers exceeds the limit of {limit}"
+        }), 400
+    
+    customers, row_positions, errors = resolve_batch_items(items)
+    
+    if output == 'typed':
+        return stream_typed_arrays(
+            len(items),
+            lambda start, stop: explain_batch_slice(analyzer, customers, row_positions, errors, start, stop)
+        )
+    if output == 'ndjson':
+        return stream_ndjson(
+            len(items),
+            lambda start, stop: analyze_batch_slice(analyzer, customers, row_positions, errors, start, stop)
+        )
+    
+    results = analyze_batch_slice(analyzer, customers, row_positions, errors, 0, len(items))
+    return jsonify({
+        "success": True,
+        "count": len(results),
+        "results": results
+    })
+
+@app.route('/api/export/analysis', methods=['GET'])
+def export_analysis():
+    """
+    Stream the analysis of every customer in company_data as NDJSON, or as
+    typed-array frames of predictions and SHAP values when asked for
+    (?format=typed or the typed-arrays Accept type).
+    Optional drill-down: ?group_by=<column>&value=<value>, e.g. group_by=state&value=TX
+    or group_by=Geographic_Cluster&value=2.
+    """
+    analyzer = g.analyzer
+    if analyzer is None or company_data is None:
+        return jsonify({
+            "error": "Analyzer or company data not initialized."
+        }), 503
+    
+    group_by = request.args.get('group_by')
+    if group_by:
+        if group_by not in company_data.columns:
+            return jsonify({
+                "error": f"Unknown group_by column '{group_by}'."
+            }), 400
+        value = request.args.get('value', '')
+        positions = np.flatnonzero(column_equals(company_data[group_by], value))
+    else:
+        positions = np.arange(len(company_data))
+    
+    def analyze_chunk(start, stop):
+        chunk_positions = positions[start:stop].tolist()
+        customers = company_data.iloc[chunk_positions].to_dict('records')
+        return analyzer.analyze_customers(customers, chunk_positions)
+    
+    if response_format() == 'typed':
+        def explain_chunk(start, stop):
+            chunk_positions = positions[start:stop].tolist()
+            customers = company_data.iloc[chunk_positions].to_dict('records')
+            return explain_batch_slice(analyzer, customers, chunk_positions, {}, 0, len(customers))
+        
+        return stream_typed_arrays(len(positions), explain_chunk)
+    
+    return stream_ndjson(len(positions), analyze_chunk)
+
 @app.route('/api/predict', methods=['POST'])
 def predict_customer():
     """
@@ -237,6 +1534,85 @@ def predict_customer():
     """
     return analyze_customer_endpoint()
 
+def score_batch(scorer, customers, errors):
+    """
+    Prediction-only results for customers resolved by resolve_batch_items, in
+    order. scorer is an analyzer or an EnsembleScorer.
+    """
+    found = [i for i in range(len(customers)) if i not in errors]
+    churn_probability, score_errors = scorer.score_customers([customers[i] for i in found])
+    # In float32, as predict_proba computes the negative-class probability
+    confidence = np.maximum(1 - churn_probability, churn_probability)
+    
+    results = [errors.get(i) for i in range(len(customers))]
+    for j, i in enumerate(found):
+        if j in score_errors:
+            results[i] = {
+                "success": False,
+                "error": score_errors[j]
+            }
+            continue
+        results[i] = {
+            "success": True,
+            "customer_id": customers[i].get('individual_id', 'New Customer'),
+            "prediction": {
+                "churn_probability": float(churn_probability[j]),
+                "will_churn": bool(churn_probability[j] > 0.5),
+                "confidence": float(confidence[j])
+            }
+        }
+    return results
+
+@app.route('/api/score', methods=['POST'])
+def score_endpoint():
+    """
+    Churn probability only, without SHAP explanations; many times cheaper than /api/analyze.
+    Body: one customer (full customer data JSON or {"customer_id": ...}), or
+    {"customers": [...]} with items as for /api/analyze/batch.
+    The prediction fields match /api/analyze exactly. Served from an exported
+    tree ensemble while the rest of the analyzer is still loading.
+    """
+    scorer = g.scorer
+    if scorer is None:
+        return jsonify({
+            "error": "Scoring model not initialized."
+        }), 503
+    
+    request_data = request.get_json(silent=True)
+    if not request_data or not isinstance(request_data, (dict, list)):
+        return jsonify({
+            "error": "No data provided"
+        }), 400
+    
+    if isinstance(request_data, dict) and 'customers' not in request_data:
+        customers, _, errors = resolve_batch_items([request_data])
+        if errors:
+            return jsonify({
+                "error": errors[0]['error']
+            }), 404 if customer_index is not None else 503
+        result = score_batch(scorer, customers, errors)[0]
+        if not result['success']:
+            return jsonify(result), 400
+        return jsonify(result)
+    
+    items = request_data if isinstance(request_data, list) else request_data['customers']
+    if not items or not isinstance(items, list):
+        return jsonify({
+            "error": "Provide a non-empty 'customers' list"
+        }), 400
+    if len(items) > MAX_SCORE_BATCH_SIZE:
+        return jsonify({
+            "error": f"Batch of {len(items)} customers exceeds the limit of {MAX_SCORE_BATCH_SIZE}"
+        }), 400
+    
+    customers, _, errors = resolve_batch_items(items)
+    results = score_batch(scorer, customers, errors)
+    return jsonify({
+        "success": True,
+        "count": len(results),
+        "results": results
+    })
+
 @app.route('/api/simulate', methods=['POST'])
 def simulate_changes():
     """
@@ -244,6 +1620,7 @@ def simulate_changes():
     Accepts modified customer data and returns prediction + SHAP analysis.
     This endpoint is optimized for real-time simulation in the dashboard.
     """
+    analyzer, simulate_coalescer = g.analyzer, g.simulate_coalescer
     if analyzer is None:
         return jsonify({
             "error": "SHAP analyzer not initialized."
@@ -259,139 +1636,573 @@ def simulate_changes():
     # Expect full customer data for simulation
     customer_data_dict = request_data
     
-    # Analyze the modified customer data
-    result = analyzer.analyze_customer(customer_data_dict)
+    # Edits of a known customer only recompute SHAP for the trees they affect
+    base_position, base_customer = (None, None)
+    if analyzer.incremental_shap is not None and customer_index is not None \
+            and customer_data_dict.get('individual_id') is not None:
+        base_position, base_customer = lookup_customer(customer_data_dict['individual_id'])
+    
+    # Analyze the modified customer data; the coalescer batches edits and new customers alike
+    trees_recomputed = None
+    if simulate_coalescer is not None:
+        result, trees_recomputed = simulate_coalescer.submit((customer_data_dict, base_position, base_customer))
+    elif base_customer is not None:
+        result, trees_recomputed = analyzer.analyze_edit(customer_data_dict, base_position, base_customer)
+    else:
+        result = analyzer.analyze_customer(customer_data_dict)
     
     if not result.get('success', False):
         return jsonify(result), 400
     
     # Add simulation flag to response
     result['is_simulation'] = True
+    if trees_recomputed is not None:
+        result['trees_recomputed'] = trees_recomputed
     
     return jsonify(result)
 
-@app.route('/api/regional-insights', methods=['GET'])
-def get_regional_insights():
+@app.route('/api/simulate/sweep', methods=['POST'])
+def simulate_sweep():
     """
-    Generate regional insights using SHAP analysis on different customer segments.
-    Groups by: Geographic_Cluster, Demographics_Cluster, Financial_Cluster, Policy_Behavioral_Cluster, state
+    Sweep one or more fields of a customer over value grids in a single pass,
+    e.g. to draw churn probability against days_tenure.
+    Body: {"customer": {...}} or {"customer_id": ...}, plus either
+    {"feature": "days_tenure", "values": [...]} or
+    {"grid": {"days_tenure": [...], "income": [...]}} for a cartesian grid.
+    Optional "top_k" (default 5) SHAP contributions are returned per point.
     """
-    if analyzer is None or company_data is None:
+    analyzer = g.analyzer
+    if analyzer is None:
         return jsonify({
-            "error": "Analyzer or company data not initialized."
+            "error": "SHAP analyzer not initialized."
         }), 503
     
+    request_data = request.json
+    
+    if not isinstance(request_data, dict):
+        return jsonify({
+            "error": "No data provided"
+        }), 400
+    
+    if 'customer_id' in request_data:
+        if company_data is None or customer_index is None:
+            return jsonify({
+                "error": "Company data not loaded."
+            }), 503
+        customer_id = request_data['customer_id']
+        _, customer_data_dict = lookup_customer(customer_id)
+        if customer_data_dict is None:
+            return jsonify({
+                "error": f"Customer ID '{customer_id}' not found in database."
+            }), 404
+    elif isinstance(request_data.get('customer'), dict):
+        customer_data_dict = request_data['customer']
+    else:
+        return jsonify({
+            "error": "Provide a base 'customer' object or a 'customer_id'"
+        }), 400
+    
+    if 'grid' in request_data:
+        grid = request_data['grid']
+    elif 'feature' in request_data:
+        grid = {request_data['feature']: request_data.get('values')}
+    else:
+        return jsonify({
+            "error": "Provide 'feature' and 'values', or a 'grid' of {feature: values}"
+        }), 400
+    
+    if not isinstance(grid, dict) or not grid:
+        return jsonify({
+            "error": "'grid' must map feature names to lists of values"
+        }), 400
+    for feature, values in grid.items():
+        if feature in IDENTIFIER_COLS or not analyzer.encoder.has_field(feature):
+            return jsonify({
+                "error": f"Unknown feature '{feature}'."
+            }), 400
+        if not isinstance(values, list) or not values:
+            return jsonify({
+                "error": f"Values for '{feature}' must be a non-empty list"
+            }), 400
+    
+    n_points = int(np.prod([len(values) for values in grid.values()]))
+    if n_points > MAX_SWEEP_POINTS:
+        return jsonify({
+            "error": f"Grid of {n_points} points exceeds the limit of {MAX_SWEEP_POINTS}"
+        }), 400
+    
+    top_k = request_data.get('top_k', 5)
+    if not isinstance(top_k, int) or not 0 <= top_k <= MAX_SWEEP_TOP_K:
+        return jsonify({
+            "error": f"'top_k' must be an integer between 0 and {MAX_SWEEP_TOP_K}"
+        }), 400
+    
     try:
-        # Use all available customer data (removed 10k limit)
-        df_sample = company_data.copy()
-        sample_size = len(df_sample)
-        
-        print(f"🔍 Analyzing regional insights for {sample_size} customers...")
-        
-        # Prepare features for SHAP analysis
-        df_features = df_sample.drop(columns=[col for col in IDENTIFIER_COLS + ['Churn', 'predicted_churn', 'predicted_churn_probability'] if col in df_sample.columns], errors='ignore')
-        
-        # Store cluster columns before encoding
-        cluster_cols = ['Geographic_Cluster', 'Demographics_Cluster', 'Financial_Cluster', 'Policy_Behavioral_Cluster', 'state']
-        cluster_data = {}
-        for col in cluster_cols:
-            if col in df_sample.columns:
-                cluster_data[col] = df_sample[col].values
+        result = analyzer.analyze_sweep(customer_data_dict, grid, top_k)
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"Error running sweep: {str(e)}"
+        }), 400
+    
+    return jsonify(result)
+
+def compute_regional_insights(analyzer, progress=None):
+    """
+    Run SHAP analysis over all of company_data and aggregate it per customer segment.
+    Groups by: Geographic_Cluster, Demographics_Cluster, Financial_Cluster, Policy_Behavioral_Cluster, state
+    
+    Customers are encoded, predicted and explained REGIONAL_CHUNK_SIZE at a time,
+    each block folded into running per-group sums (see regional_engine.py), so
+    memory use does not grow with the portfolio. progress(rows_done, total_rows),
+    if given, is called after each block.
+    """
+    # Use all available customer data (removed 10k limit). Read-only: no copy needed
+    df_sample = company_data
+    sample_size = len(df_sample)
+    
+    print(f"🔍 Analyzing regional insights for {sample_size} customers...")
+    
+    # Columns that are not model inputs
+    non_features = [col for col in IDENTIFIER_COLS + LABEL_COLS if col in df_sample.columns]
+    
+    # Store cluster columns before encoding
+    accumulators = {}
+    for col in REGIONAL_GROUPING_COLS:
+        if col in df_sample.columns:
+            accumulators[col] = GroupedShapAccumulator(df_sample[col].to_numpy(), analyzer.shap_columns)
+    
+    categorical_present = [col for col in CATEGORICAL_COLS if col in df_sample.columns and col not in non_features]
+    chunk_predictions = []
+    for start in range(0, sample_size, REGIONAL_CHUNK_SIZE):
+        df_features = df_sample.iloc[start:start + REGIONAL_CHUNK_SIZE].drop(columns=non_features)
         
         # One-hot encode
-        categorical_present = [col for col in CATEGORICAL_COLS if col in df_features.columns]
         df_encoded = pd.get_dummies(df_features, columns=categorical_present)
         df_aligned = df_encoded.reindex(columns=analyzer.model_features, fill_value=0)
+        # XGBoost and SHAP convert to float32 anyway; converting the thousands of
+        # mixed-dtype columns once up front saves seconds per call
+        features = df_aligned.to_numpy(dtype=np.float32)
         
         # Get predictions and SHAP values
-        predictions = analyzer.model.predict_proba(df_aligned)[:, 1]
-        shap_values = analyzer.explainer.shap_values(df_aligned)
+        chunk_predictions.append(analyzer.model.predict_proba(features)[:, 1])
+        shap_values = analyzer.explainer.shap_values(features)
+        for accumulator in accumulators.values():
+            accumulator.add(start, shap_values)
+        if progress is not None:
+            progress(min(start + REGIONAL_CHUNK_SIZE, sample_size), sample_size)
+    
+    predictions = np.concatenate(chunk_predictions)
+    
+    # Regional analysis results
+    regional_data = {}
+    
+    for cluster_col, accumulator in accumulators.items():
+        stats = accumulator.statistics(predictions, len(analyzer.model_features))
         
-        # Calculate absolute SHAP values
-        abs_shap = np.abs(shap_values)
+        # Top features by mean absolute SHAP
+        top_feature_indices = np.argsort(stats['mean_abs_shap'], axis=1)[:, -10:][:, ::-1]
         
-        # Regional analysis results
-        regional_data = {}
+        cluster_insights = []
+        for g, cluster_id in enumerate(stats['groups']):
+            mean_shap_by_feature = stats['mean_abs_shap'][g]
+            customer_count = int(stats['counts'][g])
+            high_risk_count = int(stats['high_risk_counts'][g])
+            
+            top_features = [{
+                "feature": analyzer.original_features[idx],
+                "encoded_feature": analyzer.model_features[idx],
+                "mean_abs_shap": float(mean_shap_by_feature[idx])
+            } for idx in top_feature_indices[g]]
+            
+            cluster_insights.append({
+                "cluster_id": int(cluster_id) if isinstance(cluster_id, (np.integer, int)) else str(cluster_id),
+                "customer_count": customer_count,
+                "avg_churn_probability": float(stats['mean_predictions'][g]),
+                "median_churn_probability": float(stats['median_predictions'][g]),
+                "high_risk_count": high_risk_count,
+                "high_risk_percentage": float(high_risk_count / customer_count * 100) if customer_count > 0 else 0,
+                "top_features": top_features
+            })
         
-        for cluster_col, cluster_values in cluster_data.items():
-            unique_clusters = np.unique(cluster_values)
-            cluster_insights = []
+        # Sort by avg churn probability
+        cluster_insights.sort(key=lambda x: x['avg_churn_probability'], reverse=True)
+        regional_data[cluster_col] = cluster_insights
+    
+    # Overall statistics
+    overall_stats = {
+        "total_customers_analyzed": sample_size,
+        "overall_avg_churn_prob": float(np.mean(predictions)),
+        "overall_high_risk_count": int(np.sum(predictions > 0.5)),
+        "overall_high_risk_percentage": float(np.sum(predictions > 0.5) / sample_size * 100)
+    }
+    
+    return {
+        "overall_statistics": overall_stats,
+        "regional_insights": regional_data,
+        "analysis_timestamp": pd.Timestamp.now().isoformat()
+    }
+
+def get_regional_sampling_frame():
+    """
+    Stratified samplers over company_data for each grouping column, plus one
+    over all customers for the overall statistics. Built on first use.
+    """
+    global regional_sampling_frame
+    data = company_data
+    with regional_sampling_lock:
+        if regional_sampling_frame is None or regional_sampling_frame[0] is not data:
+            # One shared random order, so the samples of every grouping column overlap
+            permutation = np.random.default_rng(REGIONAL_SAMPLE_SEED).permutation(len(data)).astype(
+                np.int32 if len(data) < np.iinfo(np.int32).max else np.intp
+            )
+            overall = StratifiedSample(np.zeros(len(data), dtype=np.int8), permutation)
+            samplers = {
+                col: StratifiedSample(data[col], permutation)
+                for col in REGIONAL_GROUPING_COLS if col in data.columns
+            }
+            regional_sampling_frame = (data, overall, samplers)
+        return regional_sampling_frame[1], regional_sampling_frame[2]
+
+def compute_regional_insights_approx(analyzer, grouping_cols, target_error, confidence):
+    """
+    Estimate regional insights from a stratified sample of company_data (mode=approx).
+    
+    Every group is sampled separately. REGIONAL_APPROX_PILOT_ROWS customers per
+    group estimate the spread of its churn probabilities, which sets the sample
+    size for a `confidence` interval of about +/- target_error on the group's
+    mean churn probability. Means, high-risk shares and mean |SHAP| are reported
+    with confidence intervals; counts are population counts.
+    """
+    overall_sampler, samplers = get_regional_sampling_frame()
+    samplers = {col: samplers[col] for col in grouping_cols}
+    strata = [overall_sampler, *samplers.values()]
+    z = z_score(confidence)
+    
+    # Pilot samples, explained together
+    pilots = [sampler.sample(np.minimum(REGIONAL_APPROX_PILOT_ROWS, sampler.counts)) for sampler in strata]
+    positions = np.unique(np.concatenate([rows for pilot in pilots for rows in pilot]))
+    predictions, shap_values = analyzer.explain_rows(company_data, positions)
+    
+    # Final samples extend the pilots; explain only the customers they add
+    samples = []
+    for sampler, pilot in zip(strata, pilots):
+        sigma = [
+            predictions[np.searchsorted(positions, rows)].std(ddof=1) if len(rows) > 1 else 0.0
+            for rows in pilot
+        ]
+        sizes = np.maximum(sample_sizes(sampler.counts, sigma, target_error, z), [len(rows) for rows in pilot])
+        samples.append(sampler.sample(sizes))
+    added = np.setdiff1d(np.concatenate([rows for sample in samples for rows in sample]), positions)
+    if len(added):
+        added_predictions, added_shap = analyzer.explain_rows(company_data, added)
+        positions = np.concatenate([positions, added])
+        order = np.argsort(positions)
+        positions = positions[order]
+        predictions = np.concatenate([predictions, added_predictions])[order]
+        shap_values = np.concatenate([shap_values, added_shap])[order]
+    
+    print(f"🎯 Estimated regional insights from {len(positions)} of {len(company_data)} customers")
+    
+    def interval(mean, half_width, low=0.0, high=1.0):
+        return [float(max(low, mean - half_width)), float(min(high, mean + half_width))]
+    
+    def churn_estimates(churn, population):
+        """Mean churn probability and high-risk share, each with its interval half-width."""
+        return (*mean_interval(churn, population, z),
+                *mean_interval((churn > 0.5).astype(np.float64), population, z))
+    
+    regional_data = {}
+    for (cluster_col, sampler), sample in zip(samplers.items(), samples[1:]):
+        cluster_insights = []
+        for g, cluster_id in enumerate(sampler.groups):
+            customer_count = int(sampler.counts[g])
+            idx = np.searchsorted(positions, sample[g])
+            churn = predictions[idx]
+            mean_churn, churn_error, high_risk, high_risk_error = churn_estimates(churn, customer_count)
+            mean_shap, shap_error = mean_interval(np.abs(shap_values[idx]), customer_count, z)
             
-            for cluster_id in unique_clusters:
-                if pd.isna(cluster_id):
-                    continue
-                    
-                mask = cluster_values == cluster_id
-                cluster_predictions = predictions[mask]
-                cluster_shap = abs_shap[mask]
-                
-                # Calculate statistics
-                avg_churn_prob = float(np.mean(cluster_predictions))
-                median_churn_prob = float(np.median(cluster_predictions))
-                customer_count = int(np.sum(mask))
-                high_risk_count = int(np.sum(cluster_predictions > 0.5))
-                
-                # Top features by mean absolute SHAP
-                mean_shap_by_feature = np.mean(cluster_shap, axis=0)
-                top_feature_indices = np.argsort(mean_shap_by_feature)[-10:][::-1]
-                
-                top_features = []
-                for idx in top_feature_indices:
-                    feature_name = analyzer.model_features[idx]
-                    # Extract original feature name
-                    original_feature = feature_name
-                    for cat_col in CATEGORICAL_COLS:
-                        if feature_name.startswith(cat_col + '_'):
-                            original_feature = cat_col
-                            break
-                    
-                    top_features.append({
-                        "feature": original_feature,
-                        "encoded_feature": feature_name,
-                        "mean_abs_shap": float(mean_shap_by_feature[idx])
-                    })
-                
-                cluster_insights.append({
-                    "cluster_id": int(cluster_id) if isinstance(cluster_id, (np.integer, int)) else str(cluster_id),
-                    "customer_count": customer_count,
-                    "avg_churn_probability": avg_churn_prob,
-                    "median_churn_probability": median_churn_prob,
-                    "high_risk_count": high_risk_count,
-                    "high_risk_percentage": float(high_risk_count / customer_count * 100) if customer_count > 0 else 0,
-                    "top_features": top_features
-                })
+            top_features = [{
+                "feature": analyzer.original_features[analyzer.shap_columns[j]],
+                "encoded_feature": analyzer.model_features[analyzer.shap_columns[j]],
+                "mean_abs_shap": float(mean_shap[j]),
+                "mean_abs_shap_ci": interval(mean_shap[j], shap_error[j], high=np.inf)
+            } for j in np.argsort(mean_shap)[-10:][::-1]]
             
-            # Sort by avg churn probability
-            cluster_insights.sort(key=lambda x: x['avg_churn_probability'], reverse=True)
-            regional_data[cluster_col] = cluster_insights
-        
-        # Overall statistics
-        overall_stats = {
-            "total_customers_analyzed": sample_size,
-            "overall_avg_churn_prob": float(np.mean(predictions)),
-            "overall_high_risk_count": int(np.sum(predictions > 0.5)),
-            "overall_high_risk_percentage": float(np.sum(predictions > 0.5) / sample_size * 100)
-        }
+            cluster_insights.append({
+                "cluster_id": int(cluster_id) if isinstance(cluster_id, (np.integer, int)) else str(cluster_id),
+                "customer_count": customer_count,
+                "sample_size": len(idx),
+                "avg_churn_probability": float(mean_churn),
+                "avg_churn_probability_ci": interval(mean_churn, churn_error),
+                "median_churn_probability": float(np.median(churn)),
+                "high_risk_count": int(round(high_risk * customer_count)),
+                "high_risk_percentage": float(high_risk * 100),
+                "high_risk_percentage_ci": [100 * bound for bound in interval(high_risk, high_risk_error)],
+                "top_features": top_features
+            })
         
+        # Sort by avg churn probability
+        cluster_insights.sort(key=lambda x: x['avg_churn_probability'], reverse=True)
+        regional_data[cluster_col] = cluster_insights
+    
+    # Overall statistics, from a simple random sample of all customers
+    total = len(company_data)
+    churn = predictions[np.searchsorted(positions, samples[0][0])]
+    mean_churn, churn_error, high_risk, high_risk_error = churn_estimates(churn, total)
+    overall_stats = {
+        "total_customers": total,
+        "total_customers_analyzed": len(positions),
+        "overall_avg_churn_prob": float(mean_churn),
+        "overall_avg_churn_prob_ci": interval(mean_churn, churn_error),
+        "overall_high_risk_count": int(round(high_risk * total)),
+        "overall_high_risk_percentage": float(high_risk * 100),
+        "overall_high_risk_percentage_ci": [100 * bound for bound in interval(high_risk, high_risk_error)]
+    }
+    
+    return {
+        "overall_statistics": overall_stats,
+        "regional_insights": regional_data,
+        "analysis_timestamp": pd.Timestamp.now().isoformat()
+    }
+
+def regional_insights_params(args):
+    """
+    Validated regional insights parameters from a query string or job request:
+    mode, group_by and, for mode=approx, target_error and confidence.
+    Raises ValueError with the message for a 400 response.
+    """
+    group_by = args.get('group_by')
+    mode = args.get('mode', 'exact')
+    available = [col for col in REGIONAL_GROUPING_COLS if col in company_data.columns]
+    if group_by and group_by not in available:
+        raise ValueError(f"Unknown group_by '{group_by}'. Available: {', '.join(available)}")
+    if mode == 'exact':
+        return {"mode": mode, "group_by": group_by}
+    if mode != 'approx':
+        raise ValueError(f"Unknown mode '{mode}'. Use 'exact' or 'approx'")
+    
+    try:
+        target_error = float(args.get('target_error', REGIONAL_APPROX_TARGET_ERROR))
+        confidence = float(args.get('confidence', REGIONAL_APPROX_CONFIDENCE))
+    except (TypeError, ValueError):
+        raise ValueError("target_error and confidence must be numbers")
+    if not (0 < target_error < 1 and 0 < confidence < 1):
+        raise ValueError("target_error and confidence must be between 0 and 1")
+    return {"mode": mode, "group_by": group_by, "target_error": target_error, "confidence": confidence}
+
+def run_regional_insights(analyzer, regional_insights_cache, params, progress=None):
+    """The regional insights response body for validated params."""
+    group_by = params['group_by']
+    if params['mode'] == 'approx':
+        available = [col for col in REGIONAL_GROUPING_COLS if col in company_data.columns]
+        result = compute_regional_insights_approx(
+            analyzer, [group_by] if group_by else available, params['target_error'], params['confidence']
+        )
+        approx_params = {"target_error": params['target_error'], "confidence": params['confidence']}
+    else:
+        result = regional_insights_cache.get_or_compute(lambda: compute_regional_insights(analyzer, progress))
+        approx_params = {}
+    
+    regional_data = result['regional_insights']
+    if group_by:
+        regional_data = {group_by: regional_data[group_by]}
+    
+    return {
+        "success": True,
+        "mode": params['mode'],
+        **approx_params,
+        "overall_statistics": result['overall_statistics'],
+        "regional_insights": regional_data,
+        "analysis_timestamp": result['analysis_timestamp']
+    }
+
+@app.route('/api/regional-insights', methods=['GET'])
+def get_regional_insights():
+    """
+    Regional insights using SHAP analysis on different customer segments.
+    Query parameters:
+      group_by=<grouping column>  return a single grouping
+      mode=exact (default)        every customer; served from the materialized
+                                  cache, computed only when the model or data changes
+      mode=approx                 estimated from a stratified sample, with confidence
+                                  intervals; tune with target_error (half-width on each
+                                  group's mean churn probability) and confidence
+    A cold exact computation can take long; POST /api/jobs runs it in the background.
+    """
+    analyzer, regional_insights_cache = g.analyzer, g.regional_insights_cache
+    if analyzer is None or company_data is None or regional_insights_cache is None:
         return jsonify({
-            "success": True,
-            "overall_statistics": overall_stats,
-            "regional_insights": regional_data,
-            "analysis_timestamp": pd.Timestamp.now().isoformat()
-        })
-        
+            "error": "Analyzer or company data not initialized."
+        }), 503
+    
+    try:
+        params = regional_insights_params(request.args)
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+    
+    try:
+        return jsonify(run_regional_insights(analyzer, regional_insights_cache, params))
     except Exception as e:
         return jsonify({
             "success": False,
             "error": f"Error generating regional insights: {str(e)}"
         }), 500
 
+def run_batch_scoring(analyzer, customers, row_positions, errors, progress):
+    """Analyze a batch in STREAM_CHUNK_SIZE slices, reporting progress; the /api/analyze/batch body."""
+    results = []
+    for start in range(0, len(customers), STREAM_CHUNK_SIZE):
+        stop = min(start + STREAM_CHUNK_SIZE, len(customers))
+        results.extend(analyze_batch_slice(analyzer, customers, row_positions, errors, start, stop))
+        progress(stop, len(customers))
+    return {
+        "success": True,
+        "count": len(results),
+        "results": results
+    }
+
+def job_status(job):
+    status = job.snapshot()
+    if job.status == SUCCEEDED:
+        status['result_url'] = f"/api/jobs/{job.id}/result"
+    return status
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Start a long-running analysis in the background and return its job id at once.
+    Body, one of:
+      {"type": "regional_insights", ...the /api/regional-insights parameters}
+      {"type": "batch_scoring", "customers": [...as for /api/analyze/batch]}
+    Returns 202 with the new job, or 200 with the existing one when an identical
+    request is still queued or running. Poll GET /api/jobs/<id> for progress and
+    fetch GET /api/jobs/<id>/result once it has succeeded.
+    """
+    analyzer, regional_insights_cache = g.analyzer, g.regional_insights_cache
+    if analyzer is None or company_data is None:
+        return jsonify({
+            "error": "Analyzer or company data not initialized."
+        }), 503
+    
+    request_data = request.get_json(silent=True)
+    if not isinstance(request_data, dict):
+        return jsonify({
+            "success": False,
+            "error": "Provide a JSON object with a job 'type'"
+        }), 400
+    
+    kind = request_data.get('type')
+    if kind == 'regional_insights':
+        try:
+            params = regional_insights_params(request_data)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        run = lambda progress: run_regional_insights(analyzer, regional_insights_cache, params, progress)
+    elif kind == 'batch_scoring':
+        items = request_data.get('customers')
+        if not items or not isinstance(items, list):
+            return jsonify({
+                "success": False,
+                "error": "Provide a non-empty 'customers' list"
+            }), 400
+        if len(items) > MAX_STREAM_BATCH_SIZE:
+            return jsonify({
+                "success": False,
+                "error": f"Batch of {len(items)} customers exceeds the limit of {MAX_STREAM_BATCH_SIZE}"
+            }), 400
+        params = {"customers": items}
+        customers, row_positions, errors = resolve_batch_items(items)
+        run = lambda progress: run_batch_scoring(analyzer, customers, row_positions, errors, progress)
+    else:
+        return jsonify({
+            "success": False,
+            "error": f"Unknown job type '{kind}'. Use 'regional_insights' or 'batch_scoring'"
+        }), 400
+    
+    try:
+        job, created = job_runner.submit(
+            kind, JobRunner.key(kind, params, analyzer.model_version), metrics.bind('/api/jobs', run)
+        )
+    except JobQueueFull as e:
+        return jsonify({
+            "success": False,
+            "error": f"Too many background jobs: {e}"
+        }), 429
+    
+    response = jsonify({
+        "success": True,
+        "deduplicated": not created,
+        "job": job_status(job)
+    })
+    response.headers['Location'] = f"/api/jobs/{job.id}"
+    return response, 202 if created else 200
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status and progress (rows processed, ETA) of a background job."""
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": f"Job '{job_id}' not found; it may have expired"
+        }), 404
+    return jsonify({
+        "success": True,
+        "job": job_status(job)
+    })
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Download the result of a finished job, as the synchronous endpoint would have returned it."""
+    job = job_runner.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": f"Job '{job_id}' not found; it may have expired"
+        }), 404
+    if job.status == FAILED:
+        return jsonify({
+            "success": False,
+            "error": f"Job failed: {job.error}"
+        }), 500
+    if job.status != SUCCEEDED:
+        return jsonify({
+            "success": False,
+            "error": f"Job is still {job.status}",
+            "job": job_status(job)
+        }), 409
+    
+    response = jsonify(job.result)
+    job_runner.fetched(job)
+    response.headers['Content-Disposition'] = f'attachment; filename="{job.kind}-{job.id}.json"'
+    return response
+
 if __name__ == '__main__':
-    initialize_analyzer()
+    # The listener comes up right away; /api/health/ready turns 200 once loaded
+    start_background_initialization()
     print("\n🚀 Starting Flask API server on http://localhost:5000")
     print("📋 Available endpoints:")
     print("   GET  /api/health")
+    print("   GET  /api/health/live")
+    print("   GET  /api/health/ready")
+    print("   POST /api/admin/reload-model")
+    print("   GET  /api/metrics")
     print("   GET  /api/customer/<customer_id>")
+    print("   GET  /api/shap/<customer_id>")
     print("   POST /api/analyze")
+    print("   POST /api/analyze/batch")
+    print("   GET  /api/export/analysis")
     print("   POST /api/predict")
+    print("   POST /api/score")
+    print("   POST /api/simulate/sweep")
+    print("   POST /api/jobs")
+    print("   GET  /api/jobs/<job_id>")
+    print("   GET  /api/jobs/<job_id>/result")
     app.run(debug=True, port=5000, host='0.0.0.0')
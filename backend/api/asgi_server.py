@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+ASGI serving mode for the churn API.
+
+Serves the same Flask routes as api_server.py from an asyncio event loop.
+Every request runs on a worker thread, so the loop never blocks on model work:
+- health checks and customer lookups use a small dedicated pool and stay
+  responsive while long regional-insights or batch jobs are running;
+- everything else (predict_proba / shap_values work) uses a bounded pool of
+  SHAP_WORKERS threads. XGBoost and TreeSHAP release the GIL, so these scale
+  across cores; excess requests wait on the loop instead of piling up threads.
+
+Run:
+    python backend/api/asgi_server.py
+or with any ASGI server:
+    uvicorn asgi_server:application --app-dir backend/api --port 5000
+"""
+
+import asyncio
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import api_server
+
+SHAP_WORKERS = int(os.environ.get('SHAP_WORKERS', os.cpu_count() or 4))
+LIGHT_WORKERS = int(os.environ.get('LIGHT_WORKERS', '4'))
+
+# Routes that never touch the model and must stay responsive under load
+# (/api/jobs only queues work and reports on it; jobs run on their own threads)
+LIGHT_ROUTES = ('/api/health', '/api/metrics', '/api/customer/', '/api/jobs')
+
+# Response chunks buffered between the worker thread and the event loop
+_BODY_QUEUE_SIZE = 4
+
+
+class _ClientDisconnected(Exception):
+    pass
+
+
+class FlaskASGIAdapter:
+    """Runs a WSGI app behind ASGI, dispatching requests to bounded thread pools."""
+
+    def __init__(self, wsgi_app, heavy_workers=SHAP_WORKERS, light_workers=LIGHT_WORKERS, on_startup=None):
+        self.wsgi_app = wsgi_app
+        self.on_startup = on_startup
+        self.heavy_pool = ThreadPoolExecutor(max_workers=heavy_workers, thread_name_prefix='shap-worker')
+        self.light_pool = ThreadPoolExecutor(max_workers=light_workers, thread_name_prefix='light-worker')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.on_startup is not None:
+                    await loop.run_in_executor(None, self.on_startup)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.heavy_pool.shutdown(wait=False, cancel_futures=True)
+                self.light_pool.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = await _read_body(receive)
+        environ = _build_environ(scope, body)
+        pool = self.light_pool if scope['path'].startswith(LIGHT_ROUTES) else self.heavy_pool
+
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue(maxsize=_BODY_QUEUE_SIZE)
+        disconnected = threading.Event()
+
+        def put(item):
+            if disconnected.is_set():
+                raise _ClientDisconnected()
+            asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+
+        def run_wsgi():
+            # The whole WSGI call, including iterating a streamed body, stays on
+            # one thread so Flask's context handling in stream_with_context works.
+            started = []
+            try:
+                def start_response(status, headers, exc_info=None):
+                    started.append(status)
+                    put(('start', status, headers))
+
+                iterable = self.wsgi_app(environ, start_response)
+                try:
+                    for data in iterable:
+                        if data:
+                            put(('body', data))
+                finally:
+                    if hasattr(iterable, 'close'):
+                        iterable.close()
+            except _ClientDisconnected:
+                return
+            except Exception as e:
+                print(f"❌ Unhandled error serving {environ['PATH_INFO']}: {e}")
+                if not started:
+                    put(('start', '500 Internal Server Error', [('Content-Type', 'text/plain')]))
+                    put(('body', b'Internal Server Error'))
+            finally:
+                if not disconnected.is_set():
+                    put(('end',))
+
+        worker = loop.run_in_executor(pool, run_wsgi)
+        try:
+            while True:
+                item = await chunks.get()
+                if item[0] == 'start':
+                    _, status, headers = item
+                    await send({
+                        'type': 'http.response.start',
+                        'status': int(status.split(' ', 1)[0]),
+                        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+                    })
+                elif item[0] == 'body':
+                    await send({'type': 'http.response.body', 'body': item[1], 'more_body': True})
+                else:
+                    await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+                    break
+        finally:
+            disconnected.set()
+            # Unblock a worker waiting on a full queue
+            while not chunks.empty():
+                chunks.get_nowait()
+            await worker
+
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body.extend(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return bytes(body)
+
+
+def _build_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': str(client[0]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'content-length':
+            continue
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+# Loading runs in the background so the server accepts connections (and
+# answers /api/health) immediately; /api/health/ready gates traffic.
+application = FlaskASGIAdapter(api_server.app, on_startup=api_server.start_background_initialization)
+
+
+def main():
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ uvicorn is required for the ASGI server: pip install uvicorn")
+        sys.exit(1)
+
+    print(f"\n🚀 Starting ASGI API server on http://localhost:5000 "
+          f"({SHAP_WORKERS} SHAP workers, {LIGHT_WORKERS} light workers)")
+    uvicorn.run(application, host='0.0.0.0', port=5000, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the API hot paths.
+
+Each benchmark first checks that the fast path produces the same output as the
+path it replaces, then times both on rows from company_data.
+
+    python backend/api/benchmark.py encoder --rows 500
+    python backend/api/benchmark.py score --rows 500
+    python backend/api/benchmark.py trees --rows 500
+
+The http benchmark drives a running server, so run it once against
+api_server.py and once against asgi_server.py to compare them:
+
+    python backend/api/benchmark.py http --url http://localhost:5000 --concurrency 16
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import shap
+
+import api_server
+from tree_ensemble import TreeEnsemble
+
+warnings.filterwarnings("ignore")
+
+
+def load_analyzer(args):
+    print(f"Loading model from {args.model}...")
+    model = joblib.load(args.model)
+    explainer = shap.TreeExplainer(model)
+    analyzer = api_server.ShapDashboardAnalyzer(
+        model, explainer, model.get_booster().feature_names, tree_ensemble=TreeEnsemble.from_model(model)
+    )
+
+    print(f"Loading {args.rows} rows from {args.input}...")
+    data = pd.read_csv(args.input, nrows=args.rows)
+    return analyzer, data
+
+
+def customer_dicts(data):
+    return [row.to_dict() for _, row in data.iterrows()]
+
+
+def time_per_call(fn, items, repeat):
+    """Return per-call latencies in microseconds."""
+    latencies = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append((time.perf_counter() - start) * 1e6)
+    return np.array(latencies)
+
+
+def report(name, latencies_us):
+    print(f"  {name:<24} p50 {np.percentile(latencies_us, 50):9.1f} us   "
+          f"p99 {np.percentile(latencies_us, 99):9.1f} us   mean {latencies_us.mean():9.1f} us")
+
+
+def bench_encoder(args):
+    analyzer, data = load_analyzer(args)
+    customers = customer_dicts(data)
+
+    def pandas_path(customer):
+        return analyzer.encode_frame(pd.DataFrame([customer]))
+
+    def compiled_path(customer):
+        return analyzer.encoder.encode(customer)
+
+    print("Checking parity with the pandas path...")
+    expected = pd.concat([pandas_path(c) for c in customers]).to_numpy(dtype=np.float64)
+    actual64 = analyzer.encoder.encode_many(customers, dtype=np.float64)
+    actual32 = analyzer.encoder.encode_many(customers)
+    assert np.array_equal(expected, actual64, equal_nan=True), "float64 encoding differs from pandas path"
+    assert np.array_equal(expected.astype(np.float32), actual32, equal_nan=True), "float32 encoding differs"
+    assert np.array_equal(
+        analyzer.model.predict_proba(pd.DataFrame(expected, columns=analyzer.model_features)),
+        analyzer.model.predict_proba(actual32)
+    ), "predictions differ"
+    print(f"  ✅ {len(customers)} rows identical ({analyzer.encoder.n_features} features)")
+
+    print("Per-row encode latency:")
+    pandas_us = time_per_call(pandas_path, customers, args.repeat)
+    compiled_us = time_per_call(compiled_path, customers, args.repeat)
+    report("pandas get_dummies", pandas_us)
+    report("compiled encoder", compiled_us)
+    print(f"  speedup (mean): {pandas_us.mean() / compiled_us.mean():.1f}x")
+
+
+def bench_score(args):
+    analyzer, data = load_analyzer(args)
+    customers = customer_dicts(data)
+
+    print("Checking parity with the analyze path...")
+    scored, errors = analyzer.score_customers(customers)
+    analyzed = analyzer.analyze_customers(customers)
+    expected = np.array([r['prediction']['churn_probability'] for r in analyzed], dtype=np.float32)
+    assert not errors, f"scoring failed: {errors}"
+    assert np.array_equal(scored, expected), "probabilities differ from the analyze path"
+    print(f"  ✅ {len(customers)} probabilities identical")
+
+    print("Per-row latency:")
+    analyze_us = time_per_call(analyzer.analyze_customer, customers, args.repeat)
+    score_us = time_per_call(lambda customer: analyzer.score_customers([customer]), customers, args.repeat)
+    report("analyze (with SHAP)", analyze_us)
+    report("score", score_us)
+    print(f"  speedup (mean): {analyze_us.mean() / score_us.mean():.1f}x")
+
+    print(f"Batch throughput ({len(customers)} rows per call):")
+    for name, fn in (("analyze (with SHAP)", analyzer.analyze_customers), ("score", analyzer.score_customers)):
+        batch_us = time_per_call(fn, [customers], args.repeat)
+        print(f"  {name:<24} {len(customers) / (batch_us.mean() / 1e6):11.0f} rows/s   "
+              f"p99 {np.percentile(batch_us, 99) / 1e3:9.1f} ms per batch")
+
+
+def bench_trees(args):
+    analyzer, data = load_analyzer(args)
+    X = analyzer.encoder.encode_many(customer_dicts(data))
+    ensemble, booster = analyzer.tree_ensemble, analyzer.booster
+
+    print("Checking parity with predict_proba...")
+    assert ensemble.verify(analyzer.model, X), "compiled ensemble differs from predict_proba"
+    print(f"  ✅ {len(X)} rows identical ({ensemble.n_trees} trees, {len(ensemble.left)} nodes)")
+
+    paths = (
+        ("predict_proba", analyzer.model.predict_proba),
+        ("inplace_predict", booster.inplace_predict),
+        ("compiled ensemble", ensemble.predict),
+    )
+    print("Per-row latency:")
+    for name, fn in paths:
+        report(name, time_per_call(fn, [x[None, :] for x in X], args.repeat))
+    print(f"Batch throughput ({len(X)} rows per call):")
+    for name, fn in paths:
+        batch_us = time_per_call(fn, [X], args.repeat)
+        print(f"  {name:<24} {len(X) / (batch_us.mean() / 1e6):11.0f} rows/s   "
+              f"p99 {np.percentile(batch_us, 99) / 1e3:9.1f} ms per batch")
+
+    print("Load time (the server scores from the export without unpickling the model):")
+    export = args.model + '.bench.npz'
+    ensemble.save(export)
+    start = time.perf_counter()
+    joblib.load(args.model)
+    print(f"  {'unpickle XGBClassifier':<24} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    start = time.perf_counter()
+    TreeEnsemble.load(export)
+    print(f"  {'load compiled ensemble':<24} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    os.remove(export)
+
+
+def _request_ms(url, payload=None):
+    data = None if payload is None else json.dumps(payload).encode()
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=600) as resp:
+        resp.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_http(args):
+    data = pd.read_csv(args.input, nrows=args.rows)
+    payloads = [json.loads(row.to_json()) for _, row in data.iterrows()]
+    url = args.url.rstrip('/') + args.path
+    health_url = args.url.rstrip('/') + '/api/health'
+    print(f"Driving {url} with {args.requests} requests at concurrency {args.concurrency}...")
+
+    # Probe the health check throughout to see whether it stays responsive
+    probe_ms = []
+    stop = threading.Event()
+
+    def probe():
+        while not stop.is_set():
+            probe_ms.append(_request_ms(health_url))
+            time.sleep(args.probe_interval)
+
+    def one(i):
+        payload = payloads[i % len(payloads)] if args.method == 'POST' else None
+        return _request_ms(url, payload)
+
+    prober = threading.Thread(target=probe, daemon=True)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = np.array(list(pool.map(one, range(args.requests))))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    print(f"  throughput        {args.requests / elapsed:9.1f} req/s")
+    print(f"  {args.path:<17} p50 {np.percentile(latencies, 50):9.1f} ms   "
+          f"p99 {np.percentile(latencies, 99):9.1f} ms   max {latencies.max():9.1f} ms")
+    probe_ms = np.array(probe_ms)
+    print(f"  /api/health       p50 {np.percentile(probe_ms, 50):9.1f} ms   "
+          f"p99 {np.percentile(probe_ms, 99):9.1f} ms   max {probe_ms.max():9.1f} ms")
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmark API hot paths against the code they replace")
+    p.add_argument("--model", default=api_server.MODEL_FILENAME, help="Path to trained model")
+    p.add_argument("--input", default=api_server.COMPANY_DATA_FILENAME, help="Path to company data CSV")
+    p.add_argument("--rows", type=int, default=500, help="Rows of company data to use")
+    p.add_argument("--repeat", type=int, default=3, help="Timing passes over the rows")
+    sub = p.add_subparsers(dest="benchmark", required=True)
+    sub.add_parser("encoder", help="Compiled single-row encoder vs pandas get_dummies")
+    sub.add_parser("score", help="Prediction-only scoring vs the full analyze path with SHAP")
+    sub.add_parser("trees", help="Compiled tree ensemble vs XGBoost prediction, and load time")
+    http = sub.add_parser("http", help="Throughput and tail latency of a running server")
+    http.add_argument("--url", default="http://localhost:5000", help="Server base URL")
+    http.add_argument("--path", default="/api/simulate", help="Route to load")
+    http.add_argument("--method", default="POST", choices=["GET", "POST"], help="POST sends company_data rows")
+    http.add_argument("--requests", type=int, default=500, help="Total requests")
+    http.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    http.add_argument("--probe-interval", type=float, default=0.05, help="Seconds between health probes")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchmarks = {
+        "encoder": bench_encoder,
+        "score": bench_score,
+        "trees": bench_trees,
+        "http": bench_http,
+    }
+    benchmarks[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
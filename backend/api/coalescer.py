@@ -0,0 +1,146 @@
+"""
+Micro-batching for concurrent single-customer requests.
+
+When many dashboard users drag simulation sliders at once, each request would
+otherwise make its own one-row predict_proba / shap_values call. The coalescer
+queues requests, lets a single dispatcher thread gather those arriving within a
+short window (up to a maximum batch size), runs them as one batch through
+ShapDashboardAnalyzer.simulate_many and hands each caller its own result.
+Edits of known customers and new customers share the batch: predict_proba
+runs once for all of them.
+
+A request that arrives while nothing else is in flight is dispatched at once,
+so light traffic pays no window delay.
+"""
+
+import os
+import queue
+import threading
+import time
+import weakref
+
+
+class _PendingRequest:
+    __slots__ = ('request', 'result', 'done')
+
+    def __init__(self, request):
+        self.request = request
+        self.result = None
+        self.done = threading.Event()
+
+
+def _restart_after_fork(ref):
+    coalescer = ref()
+    if coalescer is not None:
+        coalescer._start()
+
+
+class RequestCoalescer:
+    """Gathers concurrent analyze requests into batched analyzer calls."""
+
+    def __init__(self, analyze_batch, window_ms=2.0, max_batch_size=64, error_result=None):
+        """
+        analyze_batch maps a list of requests to one result per request.
+        error_result(error_dict) wraps the error reported to every request of
+        a batch that raised (default: the error dict itself).
+        """
+        self.analyze_batch = analyze_batch
+        self.error_result = error_result or (lambda error: error)
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+
+        self._start()
+
+        # Threads do not survive fork(); pre-forked workers need their own dispatcher
+        if hasattr(os, 'register_at_fork'):
+            ref = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: _restart_after_fork(ref))
+
+    def _start(self):
+        self.requests = 0
+        self.batches = 0
+
+        self._queue = queue.Queue()
+        self._in_flight = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='simulate-coalescer', daemon=True)
+        self._thread.start()
+
+    def submit(self, request):
+        """Analyze one request as part of the next batch and return its result."""
+        pending = _PendingRequest(request)
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._in_flight += 1
+                self._queue.put(pending)
+        if closed:
+            return self.analyze_batch([request])[0]
+        pending.done.wait()
+        return pending.result
+
+    def close(self):
+        """
+        Stop the dispatcher once the requests already queued are answered.
+        Later submits run unbatched on the caller's thread.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # Queued under the lock, so no request can land behind it
+            self._queue.put(None)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size and batch[-1] is not None:
+            with self._lock:
+                others_waiting = self._in_flight > len(batch)
+            if not others_waiting:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # close()'s sentinel is always the last request ever queued
+            stopping = batch[-1] is None
+            if stopping:
+                batch.pop()
+                if not batch:
+                    return
+            try:
+                results = self.analyze_batch([p.request for p in batch])
+            except Exception as e:
+                results = [self.error_result({
+                    "success": False,
+                    "error": f"Error analyzing customer: {str(e)}"
+                }) for _ in batch]
+
+            with self._lock:
+                self._in_flight -= len(batch)
+                self.requests += len(batch)
+                self.batches += 1
+            for pending, result in zip(batch, results):
+                pending.result = result
+                pending.done.set()
+            if stopping:
+                return
+
+    def stats(self):
+        """Request/batch counters for monitoring."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_batch_size": self.requests / self.batches if self.batches else 0.0
+            }
@@ -0,0 +1,143 @@
+"""
+Column-oriented, memory-mapped copy of company_data.
+
+Each column is written once as its own .npy file: numeric and boolean columns
+as-is, string columns as dictionary codes plus a categories list. Loading maps
+the files read-only and wraps them in a DataFrame without copying, so the data
+lives in the page cache rather than the process heap. Processes forked after
+loading (or separate processes loading the same directory) share those pages,
+and unlike object-dtype columns there are no per-value Python objects whose
+refcount updates would force copy-on-write page duplication.
+
+The cache directory is keyed by the CSV fingerprint and rebuilt when it changes.
+
+read_company_data is also the in-heap loader: the same dictionary-encoded
+strings, with numeric columns downcast where that loses nothing.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+MANIFEST_FILE = 'manifest.json'
+
+# Rows parsed at a time; only one chunk's worth of parsed strings is alive at once
+_CHUNK_ROWS = 100000
+
+
+def read_company_data(csv_path):
+    """
+    Read the company CSV compactly: string columns as categoricals, integers in
+    the smallest dtype that holds them (0/1 labels as int8) and floats as
+    float32 when every value survives the round trip. Values are unchanged.
+    """
+    parts = {}
+    for chunk in pd.read_csv(csv_path, chunksize=_CHUNK_ROWS):
+        for col, series in compact_frame(chunk).items():
+            parts.setdefault(col, []).append(series)
+
+    columns, mixed = {}, []
+    for col, series in parts.items():
+        kinds = {isinstance(s.dtype, pd.CategoricalDtype) for s in series}
+        if kinds == {True}:
+            columns[col] = union_categoricals(series)
+        elif kinds == {False}:
+            columns[col] = pd.concat(series, ignore_index=True)
+        else:
+            # Strings in some chunks, all-missing or numeric-looking in others
+            mixed.append(col)
+            columns[col] = None
+        series.clear()
+    if mixed:
+        # Re-read those as text, exactly as a single read_csv would see them
+        strings = pd.read_csv(csv_path, usecols=mixed, dtype='category')
+        for col in mixed:
+            columns[col] = strings[col]
+    return compact_frame(pd.DataFrame(columns))
+
+
+def compact_frame(df):
+    """Downcast df's columns in place (see read_company_data) and return it."""
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            df[col] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif series.dtype == np.float64:
+            narrow = series.astype(np.float32)
+            if np.array_equal(narrow.to_numpy(np.float64), series.to_numpy(), equal_nan=True):
+                df[col] = narrow
+    return df
+
+
+def build_columnar(df, directory):
+    """Write `df` as one .npy file per column plus a manifest."""
+    directory = Path(directory)
+    tmp_dir = directory.with_name(directory.name + '.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype):
+            # Codes come out in the smallest integer dtype pandas uses for this
+            # many categories, so from_codes can wrap the mapped file as-is.
+            categorical = pd.Categorical(series)
+            filename = f"{i}.codes.npy"
+            np.save(tmp_dir / filename, categorical.codes)
+            columns.append({
+                "name": col,
+                "kind": "categorical",
+                "file": filename,
+                "categories": [str(c) for c in categorical.categories]
+            })
+        else:
+            filename = f"{i}.npy"
+            np.save(tmp_dir / filename, series.to_numpy())
+            columns.append({"name": col, "kind": "numeric", "file": filename})
+
+    with open(tmp_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"n_rows": len(df), "columns": columns}, f)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+
+
+def open_columnar(directory):
+    """Map a columnar directory into a DataFrame without copying the column data."""
+    directory = Path(directory)
+    with open(directory / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    data = {}
+    for column in manifest['columns']:
+        values = np.load(directory / column['file'], mmap_mode='r')
+        if column['kind'] == 'categorical':
+            values = pd.Categorical.from_codes(values, categories=column['categories'], validate=False)
+        data[column['name']] = values
+
+    # copy=False keeps one block per column instead of consolidating (copying)
+    # same-dtype columns into 2-D blocks
+    return pd.DataFrame(data, copy=False)
+
+
+def load_columnar_company_data(csv_path, cache_dir, fingerprint):
+    """Open the columnar copy of `csv_path`, building it from the CSV on first use."""
+    directory = Path(cache_dir) / fingerprint
+    if not (directory / MANIFEST_FILE).exists():
+        print(f"🧱 Building columnar copy of {csv_path}...")
+        build_columnar(read_company_data(csv_path), directory)
+
+        # Copies of older CSV versions are never read again
+        for entry in Path(cache_dir).iterdir():
+            if entry.is_dir() and entry.name != fingerprint:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    return open_columnar(directory)
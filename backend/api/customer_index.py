@@ -0,0 +1,59 @@
+"""
+Customer ID index for the API server.
+Maps normalized individual_id values to row positions in company_data so
+lookups are a single dict access instead of a full-table boolean scan.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_customer_id(customer_id):
+    """
+    Normalize a customer ID the way explain_individual.py matches them:
+    numeric and string IDs compare equal, whitespace is stripped and the
+    frontend's 'C-' display prefix is ignored.
+    """
+    if customer_id is None:
+        return None
+    if isinstance(customer_id, (float, np.floating)):
+        if np.isnan(customer_id):
+            return None
+        if float(customer_id).is_integer():
+            customer_id = int(customer_id)
+
+    key = str(customer_id).strip()
+    if key.startswith('C-'):
+        key = key[2:].strip()
+    # IDs read from a float column or typed into a form as "123.0"
+    if key.endswith('.0') and key[:-2].isdigit():
+        key = key[:-2]
+    return key or None
+
+
+class CustomerIndex:
+    """Hash index from normalized customer ID to row position."""
+
+    def __init__(self, ids):
+        ids = pd.Series(ids).reset_index(drop=True)
+        if pd.api.types.is_integer_dtype(ids):
+            keys = ids.astype(str)
+        else:
+            keys = ids.map(normalize_customer_id)
+
+        # Keep the first occurrence, like .iloc[0] on the old boolean scan
+        keep = keys.notna() & ~keys.duplicated()
+        self._positions = dict(zip(keys[keep], np.flatnonzero(keep.to_numpy()).tolist()))
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, customer_id):
+        return self.get(customer_id) is not None
+
+    def get(self, customer_id):
+        """Return the row position for a customer ID, or None if unknown."""
+        key = normalize_customer_id(customer_id)
+        if key is None:
+            return None
+        return self._positions.get(key)
@@ -0,0 +1,92 @@
+"""
+Compiled feature encoder for the API hot path.
+
+Replaces the per-request pd.DataFrame -> pd.get_dummies -> reindex pipeline
+with lookups into tables built once from the booster's feature names. Each
+raw numeric field maps to its column index and each CATEGORICAL_COLS value
+maps to the index of its one-hot column, so encoding a customer is a handful
+of dict lookups into a zeroed row.
+
+The output matches ShapDashboardAnalyzer.encode_frame (the pandas path):
+unknown categories and absent fields stay 0, missing values become NaN.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class FeatureEncoder:
+    """Encodes raw customer dicts straight into model-aligned rows."""
+
+    def __init__(self, model_features, categorical_cols, identifier_cols):
+        self.model_features = list(model_features)
+        self.n_features = len(self.model_features)
+        self.identifier_cols = set(identifier_cols)
+
+        self.column_index = {name: i for i, name in enumerate(self.model_features)}
+
+        # value string -> column index, per categorical column, mirroring
+        # pd.get_dummies' '<column>_<value>' naming
+        self.categorical_index = {}
+        for col in categorical_cols:
+            prefix = col + '_'
+            self.categorical_index[col] = {
+                name[len(prefix):]: i
+                for i, name in enumerate(self.model_features)
+                if name.startswith(prefix)
+            }
+
+    def encode_into(self, row, customer_data):
+        """Fill a zeroed 1-D row (length n_features) for one customer."""
+        for key, value in customer_data.items():
+            if key in self.identifier_cols:
+                continue
+
+            categories = self.categorical_index.get(key)
+            if categories is not None:
+                if _is_missing(value):
+                    continue
+                idx = categories.get(str(value))
+                if idx is not None:
+                    row[idx] = 1.0
+                continue
+
+            idx = self.column_index.get(key)
+            if idx is not None:
+                row[idx] = np.nan if _is_missing(value) else float(value)
+        return row
+
+    def encode(self, customer_data, dtype=np.float32):
+        """Encode one customer into a new (1, n_features) matrix."""
+        row = np.zeros((1, self.n_features), dtype=dtype)
+        self.encode_into(row[0], customer_data)
+        return row
+
+    def has_field(self, key):
+        """True if `key` is a raw field the model uses."""
+        return key in self.categorical_index or key in self.column_index
+
+    def assign(self, matrix, key, values):
+        """Overwrite raw field `key` in each row of an encoded matrix with the matching entry of `values`."""
+        categories = self.categorical_index.get(key)
+        if categories is not None:
+            matrix[:, list(categories.values())] = 0.0
+            for row, value in zip(matrix, values):
+                idx = None if _is_missing(value) else categories.get(str(value))
+                if idx is not None:
+                    row[idx] = 1.0
+            return matrix
+
+        matrix[:, self.column_index[key]] = [np.nan if _is_missing(v) else float(v) for v in values]
+        return matrix
+
+    def encode_many(self, customers, dtype=np.float32):
+        """Encode a list of customer dicts into a preallocated (n, n_features) matrix."""
+        matrix = np.zeros((len(customers), self.n_features), dtype=dtype)
+        for row, customer_data in zip(matrix, customers):
+            self.encode_into(row, customer_data)
+        return matrix
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, (float, np.floating)) and np.isnan(value)) or value is pd.NaT
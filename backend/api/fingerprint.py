@@ -0,0 +1,27 @@
+"""
+Content fingerprints for the files the API serves from (model pickle, company CSV).
+Precomputed artifacts record the fingerprints they were built from so they can
+be rejected or rebuilt when either input changes.
+"""
+
+import hashlib
+
+_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def file_fingerprint(path):
+    """Return a short SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def combine_fingerprints(*fingerprints):
+    """Fold several file fingerprints (e.g. model + data) into one cache key."""
+    digest = hashlib.sha256()
+    for fingerprint in fingerprints:
+        digest.update(fingerprint.encode())
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
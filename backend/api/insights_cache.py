@@ -0,0 +1,94 @@
+"""
+Materialized results for /api/regional-insights.
+
+The insights depend only on the model and company_data, so they are computed
+once, written to disk per grouping column under a directory named after the
+model + data fingerprint, and served from memory afterwards. A new model or
+data file produces a new fingerprint and the next request rebuilds.
+"""
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+OVERALL_FILE = 'overall.json'
+
+
+class RegionalInsightsCache:
+    """Fingerprint-keyed, on-disk + in-memory cache of regional insights."""
+
+    def __init__(self, cache_dir, fingerprint):
+        self.root = Path(cache_dir)
+        self.fingerprint = fingerprint
+        self.directory = self.root / fingerprint
+        self._result = None
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, compute):
+        """
+        Return the materialized insights, loading them from disk or calling
+        `compute()` on a miss. Concurrent misses compute only once.
+        """
+        if self._result is not None:
+            return self._result
+
+        with self._lock:
+            if self._result is None:
+                self._result = self._load()
+            if self._result is None:
+                print("🔄 Regional insights cache miss; computing...")
+                result = compute()
+                self._save(result)
+                self._result = result
+        return self._result
+
+    def _load(self):
+        overall_path = self.directory / OVERALL_FILE
+        if not overall_path.exists():
+            return None
+        try:
+            with open(overall_path, 'r', encoding='utf-8') as f:
+                overall = json.load(f)
+            regional = {}
+            for col in overall['grouping_columns']:
+                with open(self.directory / f"{col}.json", 'r', encoding='utf-8') as f:
+                    regional[col] = json.load(f)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Ignoring unreadable regional insights cache: {e}")
+            return None
+
+        print(f"📦 Loaded regional insights from cache {self.fingerprint}")
+        return {
+            "overall_statistics": overall['overall_statistics'],
+            "regional_insights": regional,
+            "analysis_timestamp": overall['analysis_timestamp']
+        }
+
+    def _save(self, result):
+        try:
+            tmp_dir = self.root / f"{self.fingerprint}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir(parents=True)
+
+            for col, insights in result['regional_insights'].items():
+                with open(tmp_dir / f"{col}.json", 'w', encoding='utf-8') as f:
+                    json.dump(insights, f)
+            with open(tmp_dir / OVERALL_FILE, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "grouping_columns": list(result['regional_insights']),
+                    "overall_statistics": result['overall_statistics'],
+                    "analysis_timestamp": result['analysis_timestamp']
+                }, f)
+
+            shutil.rmtree(self.directory, ignore_errors=True)
+            os.replace(tmp_dir, self.directory)
+
+            # Results for older model/data versions can never be served again
+            for entry in self.root.iterdir():
+                if entry.is_dir() and entry.name != self.fingerprint:
+                    shutil.rmtree(entry, ignore_errors=True)
+        except OSError as e:
+            # A read-only deploy still gets the in-memory copy
+            print(f"⚠️  Could not persist regional insights cache: {e}")
@@ -0,0 +1,190 @@
+"""
+In-process background jobs for long-running analytics.
+
+Whole-portfolio regional insights or scoring a large batch can take longer
+than clients and proxies wait for a response. POST /api/jobs queues the work
+on a small, bounded pool of worker threads and answers at once with a job id;
+GET /api/jobs/<id> reports progress (rows processed, ETA) and
+GET /api/jobs/<id>/result returns the result once the job has finished.
+
+A request identical to one already queued or running (same kind, parameters
+and model version) is given that job instead of starting a second one.
+Finished jobs and their results are kept for a retention period, then dropped;
+a result that has been downloaded is kept only for a short grace period (long
+enough to retry a failed download). At most max_retained finished jobs are
+kept at once, the oldest dropped first, so results held in memory stay bounded
+however many distinct jobs clients submit.
+
+Jobs live in the process that accepted them: under pre-fork serving, a job is
+only visible to the worker that started it.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class JobQueueFull(Exception):
+    """Raised by JobRunner.submit when max_pending jobs are already waiting or running."""
+
+
+class Job:
+    """One background job: its status, progress and, once finished, result or error."""
+
+    def __init__(self, kind, key):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.fetched_at = None
+        self.rows_processed = 0
+        self.total_rows = None
+        self.result = None
+        self.error = None
+
+    def report(self, rows_processed, total_rows):
+        """Progress callback handed to the job function."""
+        self.rows_processed = rows_processed
+        self.total_rows = total_rows
+
+    @property
+    def finished(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def eta_seconds(self):
+        """Time left at the average rate so far, once some rows are done."""
+        if self.status != RUNNING or not self.total_rows or not self.rows_processed:
+            return None
+        elapsed = time.time() - self.started_at
+        return elapsed * (self.total_rows - self.rows_processed) / self.rows_processed
+
+    def snapshot(self):
+        """Status for GET /api/jobs/<id>."""
+        eta = self.eta_seconds()
+        end = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "type": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "progress": {
+                "rows_processed": self.rows_processed,
+                "total_rows": self.total_rows,
+                "fraction": self.rows_processed / self.total_rows if self.total_rows else None
+            },
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "error": self.error
+        }
+
+
+class JobRunner:
+    """Bounded worker pool plus a registry of jobs, deduplicated by request key."""
+
+    def __init__(self, max_workers=2, retention_seconds=3600, max_pending=16, max_retained=64,
+                 fetched_retention_seconds=60):
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self.max_pending = max_pending
+        self.max_retained = max_retained
+        self.fetched_retention_seconds = fetched_retention_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind, params, model_version):
+        """Dedup key for a job: kind, parameters (as canonical JSON) and model version."""
+        digest = hashlib.sha256(f"{kind}\0{model_version}\0".encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def submit(self, kind, key, fn):
+        """
+        Queue fn(progress) as a job of `kind` unless a job with the same key is
+        queued or running. Returns (job, created). progress(rows_processed,
+        total_rows) may be called by fn to report how far it has got.
+        """
+        with self._lock:
+            self._expire()
+            job = self._active.get(key)
+            if job is not None:
+                return job, False
+            if len(self._active) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._active)} jobs are already queued or running")
+            job = Job(kind, key)
+            self._jobs[job.id] = job
+            self._active[key] = job
+        self._pool.submit(self._run, job, fn)
+        return job, True
+
+    def get(self, job_id):
+        """The job with this id, or None if unknown or expired."""
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def fetched(self, job):
+        """Record that a finished job's result was downloaded; it then expires after the grace period."""
+        with self._lock:
+            if job.fetched_at is None:
+                job.fetched_at = time.time()
+
+    def stats(self):
+        """Number of retained jobs per status."""
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def _run(self, job, fn):
+        job.started_at = time.time()
+        job.status = RUNNING
+        try:
+            job.result = fn(job.report)
+            if job.total_rows is not None:
+                job.rows_processed = job.total_rows
+            status = SUCCEEDED
+        except Exception as e:
+            job.error = str(e)
+            status = FAILED
+            print(f"❌ Job {job.id} ({job.kind}) failed: {e}")
+        # finished_at first: expiry reads it as soon as the status is final
+        job.finished_at = time.time()
+        job.status = status
+        with self._lock:
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            self._expire()
+
+    def _expire(self):
+        now = time.time()
+        cutoff = now - self.retention_seconds
+        fetched_cutoff = now - self.fetched_retention_seconds
+        finished = []
+        for job_id, job in list(self._jobs.items()):
+            if not job.finished:
+                continue
+            if job.finished_at < cutoff or (job.fetched_at is not None and job.fetched_at < fetched_cutoff):
+                del self._jobs[job_id]
+            else:
+                finished.append(job)
+        # Over the cap: drop the oldest finished jobs
+        finished.sort(key=lambda job: job.finished_at)
+        for job in finished[:max(len(finished) - self.max_retained, 0)]:
+            del self._jobs[job.id]
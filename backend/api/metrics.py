@@ -0,0 +1,173 @@
+"""
+Per-stage latency histograms and request gauges for /api/metrics.
+
+Code under measurement wraps each stage in `with metrics.stage('encode'):`.
+The endpoint label comes from a context variable set when a request starts,
+so stages run by analyzer code are attributed to the route that called them;
+work on other threads keeps the label if it is submitted with
+contextvars.copy_context(), and is labelled 'background' otherwise.
+
+render() produces the Prometheus text exposition format, so no client library
+is needed. Each process keeps its own counters: under pre-fork serving a
+scrape reflects whichever worker answered it.
+"""
+
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; fine-grained at the low end, where cached and store-served requests land
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Label for work not running on behalf of a request
+BACKGROUND_ENDPOINT = 'background'
+
+_endpoint = contextvars.ContextVar('metrics_endpoint', default=BACKGROUND_ENDPOINT)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self, n_buckets):
+        self.counts = [0] * n_buckets
+        self.total = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """Thread-safe registry of stage histograms and per-endpoint request counts."""
+
+    def __init__(self, prefix='churn_api', buckets=LATENCY_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._stages = {}
+        self._requests = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def set_endpoint(self, endpoint):
+        """Label stages run from the current context (thread) with `endpoint`."""
+        _endpoint.set(endpoint)
+
+    def clear_endpoint(self):
+        _endpoint.set(BACKGROUND_ENDPOINT)
+
+    def bind(self, endpoint, fn):
+        """Wrap `fn` so stages it runs on any thread are labelled with `endpoint`."""
+        def bound(*args, **kwargs):
+            token = _endpoint.set(endpoint)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _endpoint.reset(token)
+        return bound
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as stage `name` of the current endpoint."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, stage, seconds, endpoint=None):
+        key = (endpoint or _endpoint.get(), stage)
+        with self._lock:
+            histogram = self._stages.get(key)
+            if histogram is None:
+                histogram = self._stages[key] = _Histogram(len(self.buckets))
+            self._record(histogram, seconds)
+
+    def request_started(self, endpoint):
+        with self._lock:
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+
+    def request_finished(self, endpoint, seconds):
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+            histogram = self._requests.get(endpoint)
+            if histogram is None:
+                histogram = self._requests[endpoint] = _Histogram(len(self.buckets))
+            self._record(histogram, seconds)
+
+    def render(self, extra=()):
+        """
+        Prometheus text format. `extra` adds (name, type, help, samples) families,
+        samples being (labels dict, value) pairs, for gauges owned elsewhere.
+        """
+        with self._lock:
+            stages = {k: (list(h.counts), h.total, h.count) for k, h in self._stages.items()}
+            requests = {k: (list(h.counts), h.total, h.count) for k, h in self._requests.items()}
+            in_flight = dict(self._in_flight)
+
+        lines = []
+        self._render_histograms(
+            lines, f"{self.prefix}_stage_duration_seconds",
+            "Time spent in each stage of request handling",
+            {(('endpoint', e), ('stage', s)): h for (e, s), h in sorted(stages.items())}
+        )
+        self._render_histograms(
+            lines, f"{self.prefix}_request_duration_seconds",
+            "End-to-end request handling time",
+            {(('endpoint', e),): h for e, h in sorted(requests.items())}
+        )
+        _render_family(lines, f"{self.prefix}_requests_in_flight", 'gauge',
+                       "Requests currently being handled",
+                       [({'endpoint': e}, n) for e, n in sorted(in_flight.items())])
+        for name, kind, help_text, samples in extra:
+            _render_family(lines, f"{self.prefix}_{name}", kind, help_text, samples)
+        return "\n".join(lines) + "\n"
+
+    def _record(self, histogram, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        if i < len(self.buckets):
+            histogram.counts[i] += 1
+        histogram.total += seconds
+        histogram.count += 1
+
+    def _render_histograms(self, lines, name, help_text, histograms):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, (counts, total, count) in histograms.items():
+            labels = dict(labels)
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {cumulative}")
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+
+def _render_family(lines, name, kind, help_text, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Pre-fork multi-process serving mode (POSIX only).
+
+The parent process loads everything once: the model and TreeExplainer, the
+SHAP store, and a memory-mapped columnar copy of company_data (see
+columnar_data.py). It then opens the listening socket and forks the workers,
+which accept connections on the shared socket.
+
+Workers inherit the loaded state copy-on-write, so they start serving
+immediately and N workers cost roughly one copy of the model and data in RAM:
+- company_data columns and the SHAP store are file-backed mmaps shared through
+  the page cache;
+- gc.freeze() moves the parent's objects out of the collector's reach so
+  garbage collection in the workers does not touch (and copy) their pages.
+A worker that exits is replaced.
+
+Model hot-reload (MODEL_WATCH_INTERVAL, /api/admin/reload-model) happens per
+worker, and a reloaded model is private to the worker that loaded it. Prefer
+the file watch here, so every worker picks up the new model; restart the
+server to get back to a single shared copy.
+
+    python backend/api/prefork_server.py --workers 4
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+
+from werkzeug.serving import make_server
+
+import api_server
+
+
+def serve_worker(sock, host, port):
+    """Run one worker's request loop on the inherited listening socket."""
+    server = make_server(host, port, api_server.app, threaded=True, fd=sock.fileno())
+    api_server.start_model_watcher()
+    server.serve_forever()
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Serve the churn API from pre-forked worker processes")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    p.add_argument("--host", default="0.0.0.0", help="Bind address")
+    p.add_argument("--port", type=int, default=5000, help="Bind port")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not hasattr(os, 'fork'):
+        print("❌ Pre-fork serving needs os.fork (Linux/macOS). Use asgi_server.py on this platform.")
+        sys.exit(1)
+
+    # Listen before loading: connections arriving during startup queue in the
+    # backlog instead of being refused. Loading itself stays in the parent so
+    # the workers share it.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    api_server.initialize_analyzer(columnar_data=True)
+
+    # Everything loaded so far is shared with the workers; keep the collector
+    # from writing to those objects' pages.
+    gc.collect()
+    gc.freeze()
+
+    workers = set()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                serve_worker(sock, args.host, args.port)
+            finally:
+                os._exit(0)
+        workers.add(pid)
+
+    def shutdown(signum, frame):
+        print(f"\n🛑 Stopping {len(workers)} workers...")
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for _ in range(args.workers):
+        spawn()
+    print(f"\n🚀 Pre-fork API server on http://{args.host}:{args.port} with {args.workers} workers")
+
+    while True:
+        pid, status = os.wait()
+        if pid in workers:
+            workers.discard(pid)
+            print(f"⚠️  Worker {pid} exited (status {status}); starting a replacement")
+            spawn()
+
+
+if __name__ == '__main__':
+    main()
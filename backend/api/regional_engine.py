@@ -0,0 +1,167 @@
+"""
+Chunked, memory-bounded aggregation for whole-portfolio SHAP analyses.
+
+Regional insights need, for every group of every grouping column, churn
+probability statistics and the mean |SHAP| of every encoded feature.
+Explaining the whole portfolio at once materializes a customers x encoded
+features SHAP matrix (plus its absolute value), which for a large company file
+and thousands of one-hot columns does not fit in memory. Instead the caller
+explains fixed-size row blocks and folds each one into a GroupedShapAccumulator
+per grouping column, so peak memory is set by the block size. Only the churn
+probabilities (one float per customer) are kept for the whole portfolio,
+since group medians need every value.
+
+The |SHAP| sums are accumulated row by row in row order, in the SHAP values'
+own dtype: the arithmetic np.mean(axis=0) performs on the full matrix, so the
+results are bit-for-bit those of aggregating it in one piece. Only the
+features the model splits on are accumulated; TreeSHAP gives every other
+feature exactly zero.
+
+For interactive use the same statistics can instead be estimated from a
+sample (StratifiedSample): each group of a grouping column is sampled
+separately, with a sample size chosen so the confidence interval of the
+group's mean churn probability is about a target half-width, and means are
+reported with confidence intervals.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from numba import njit
+
+
+@njit(nogil=True, cache=True)
+def _accumulate_abs(sums, codes, rows, columns):
+    for i in range(rows.shape[0]):
+        g = codes[i]
+        if g < 0:
+            continue
+        for k in range(columns.shape[0]):
+            sums[g, k] += abs(rows[i, columns[k]])
+
+
+class GroupedShapAccumulator:
+    """Running per-group |SHAP| sums for one grouping column, fed a block of rows at a time."""
+
+    def __init__(self, group_values, columns):
+        """
+        group_values: the grouping column for every customer, in row order.
+        columns: encoded feature indices to accumulate (the split features).
+        Groups are the sorted unique non-missing values; rows with a missing
+        value belong to no group.
+        """
+        present = np.flatnonzero(~pd.isna(group_values))
+        self.groups, codes = np.unique(group_values[present], return_inverse=True)
+        self.codes = np.full(len(group_values), -1, dtype=np.intp)
+        self.codes[present] = codes
+        self.counts = np.bincount(codes, minlength=len(self.groups))
+        self.columns = np.asarray(columns, dtype=np.intp)
+        self.sums = None
+
+    def add(self, start, shap_rows):
+        """Fold the SHAP values of rows start, start + 1, ... (full encoded width) into the sums."""
+        if self.sums is None:
+            self.sums = np.zeros((len(self.groups), len(self.columns)), dtype=shap_rows.dtype)
+        codes = self.codes[start:start + len(shap_rows)]
+        _accumulate_abs(self.sums, codes, np.ascontiguousarray(shap_rows), self.columns)
+
+    def statistics(self, predictions, n_features):
+        """
+        Per-group statistics once every row has been added. predictions holds
+        every customer's churn probability in row order. Means and medians are
+        computed exactly as np.mean / np.median would on each group's rows.
+        """
+        present = self.codes >= 0
+        codes = self.codes[present]
+        group_predictions = predictions[present]
+        counts = self.counts
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        # Each group's rows contiguous and in their original order
+        ordered = group_predictions[np.argsort(codes, kind='stable')]
+        mean_predictions = np.array([ordered[s:s + n].mean() for s, n in zip(starts, counts)])
+
+        # Medians: one sort by (group, prediction), then the middle element(s) of each run
+        by_value = group_predictions[np.lexsort((group_predictions, codes))]
+        low, high = by_value[starts + (counts - 1) // 2], by_value[starts + counts // 2]
+        median_predictions = (low + high) / 2
+
+        high_risk_counts = np.bincount(codes[group_predictions > 0.5], minlength=len(self.groups))
+
+        dtype = self.sums.dtype if self.sums is not None else np.float32
+        mean_abs_shap = np.zeros((len(self.groups), n_features), dtype=dtype)
+        if self.sums is not None:
+            mean_abs_shap[:, self.columns] = self.sums / counts[:, None].astype(dtype)
+
+        return {
+            "groups": self.groups,
+            "counts": counts,
+            "mean_predictions": mean_predictions,
+            "median_predictions": median_predictions,
+            "high_risk_counts": high_risk_counts,
+            "mean_abs_shap": mean_abs_shap
+        }
+
+
+class StratifiedSample:
+    """
+    Nested random samples of every group of one grouping column.
+
+    Samplers share a `permutation` (a random ordering of the row positions)
+    and take each group's rows in that order. A group's first n rows are a
+    simple random sample without replacement, a larger sample extends a
+    smaller one, and samples of different grouping columns draw on the same
+    low-ranked rows, so together they need few distinct customers explained.
+    """
+
+    def __init__(self, group_values, permutation):
+        """
+        group_values: the grouping column for every customer, in row order.
+        Groups are the sorted unique non-missing values; rows with a missing
+        value belong to no group.
+        """
+        codes, groups = pd.factorize(group_values, sort=True)
+        self.groups = np.asarray(groups)
+        self.counts = np.bincount(codes[codes >= 0], minlength=len(self.groups))
+        
+        # Narrow codes let the stable argsort use a radix sort
+        if len(self.groups) < np.iinfo(np.int16).max:
+            codes = codes.astype(np.int16)
+        ranked = permutation[np.argsort(codes[permutation], kind='stable')]
+        # Missing values (code -1) sort first
+        self.rows = ranked[len(ranked) - self.counts.sum():]
+        self.starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+
+    def sample(self, sizes):
+        """Row positions of the first sizes[g] sampled rows of each group g."""
+        return [self.rows[s:s + n] for s, n in zip(self.starts, sizes)]
+
+
+def z_score(confidence):
+    """Two-sided normal critical value, e.g. 1.96 for a confidence of 0.95."""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def sample_sizes(counts, sigma, target_error, z):
+    """
+    Rows to sample per group so a group mean's confidence interval half-width
+    is about target_error, given each group's size and standard deviation
+    estimate (finite population corrected, at most the whole group).
+    """
+    n0 = np.maximum((z * np.asarray(sigma, dtype=np.float64) / target_error) ** 2, 1.0)
+    return np.minimum(np.ceil(n0 / (1 + (n0 - 1) / counts)), counts).astype(np.intp)
+
+
+def mean_interval(values, population, z):
+    """
+    Per-column mean of `values`, a simple random sample of `population` rows,
+    and the half-width of its confidence interval. A sample covering the whole
+    population is exact (half-width zero).
+    """
+    n = len(values)
+    mean = values.mean(axis=0, dtype=np.float64)
+    if n >= population:
+        return mean, np.zeros_like(mean)
+    sd = values.std(axis=0, ddof=1, dtype=np.float64)
+    return mean, z * sd / np.sqrt(n) * np.sqrt(1 - n / population)
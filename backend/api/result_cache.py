@@ -0,0 +1,75 @@
+"""
+In-process LRU cache of analysis results, addressed by content.
+
+The key is a hash of the encoded feature row (float64, in model feature order)
+together with the model fingerprint, so any two requests that encode to the
+same row share a result, whichever customer or endpoint they came from, and
+results from another model can never be served. The identifier columns are not
+part of the encoded row, so customer_id is filled in per request on the way out.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class AnalysisCache:
+    """Bounded LRU of analyze results keyed by encoded row + model fingerprint."""
+
+    def __init__(self, max_entries, model_fingerprint):
+        self.max_entries = max_entries
+        self.model_fingerprint = model_fingerprint.encode()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, feature_row):
+        """Canonical key for one encoded feature row."""
+        # One-hot rows are almost all zeros: hash the non-zero positions (as a
+        # bitmap) and their values rather than the full row
+        row = np.asarray(feature_row, dtype=np.float64)
+        nonzero = row != 0
+        digest = hashlib.blake2b(self.model_fingerprint, digest_size=16)
+        digest.update(np.packbits(nonzero).tobytes())
+        digest.update(row[nonzero].tobytes())
+        return digest.digest()
+
+    def get(self, key, customer_id):
+        """Cached result for `key` labelled with `customer_id`, or None."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers add top-level fields to the result; keep the cached one clean
+        return {**result, "customer_id": customer_id}
+
+    def put(self, key, result):
+        """Store a successful result, evicting the least recently used beyond max_entries."""
+        if not result.get('success', False) or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = {**result}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
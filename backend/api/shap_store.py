@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Precomputed SHAP store for every customer in company_data.
+
+Predictions and SHAP vectors are computed once per deployment and written as
+.npy files keyed by row position in company_data. The API opens them with
+np.load(mmap_mode='r'), so a lookup for a known customer is a page read and
+several server processes share the same pages.
+
+Only the columns the booster actually splits on are stored: TreeSHAP assigns
+exactly zero to every other feature, and with thousands of one-hot columns
+that keeps the store a small fraction of the dense N x features matrix.
+
+Build (or rebuild after changing the model or company data):
+    python backend/api/shap_store.py
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fingerprint import file_fingerprint
+
+STORE_VERSION = 1
+META_FILE = 'meta.json'
+PROBA_FILE = 'predictions.npy'
+SHAP_FILE = 'shap_values.npy'
+COLUMNS_FILE = 'shap_columns.npy'
+
+
+def used_feature_columns(model, model_features):
+    """Indices of model features that appear in at least one tree split."""
+    used = set(model.get_booster().get_score(importance_type='weight'))
+    return np.array([i for i, name in enumerate(model_features) if name in used], dtype=np.int32)
+
+
+def build_shap_store(analyzer, data, out_dir, model_fingerprint, data_fingerprint, chunk_size=5000):
+    """Compute predictions and SHAP values for every row of `data` and write the store."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    n_rows = len(data)
+    columns = used_feature_columns(analyzer.model, analyzer.model_features)
+    print(f"🧮 Building SHAP store for {n_rows} customers "
+          f"({len(columns)} of {len(analyzer.model_features)} features used by the model)")
+
+    # Write under temporary names and rename at the end so a server never
+    # opens a half-written store. meta.json goes first and comes back last:
+    # while the data files are being replaced there is no meta to pair them with.
+    meta_path = out_dir / META_FILE
+    if meta_path.exists():
+        os.remove(meta_path)
+
+    proba_tmp = out_dir / (PROBA_FILE + '.tmp')
+    shap_tmp = out_dir / (SHAP_FILE + '.tmp')
+    proba = np.lib.format.open_memmap(proba_tmp, mode='w+', dtype=np.float32, shape=(n_rows, 2))
+    shap_values = np.lib.format.open_memmap(shap_tmp, mode='w+', dtype=np.float32, shape=(n_rows, len(columns)))
+
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        X = analyzer.encode_frame(data.iloc[start:stop])
+        proba[start:stop] = analyzer.model.predict_proba(X)
+        shap_values[start:stop] = analyzer.explainer.shap_values(X)[:, columns]
+        print(f"   {stop}/{n_rows} rows")
+
+    proba.flush()
+    shap_values.flush()
+    del proba, shap_values
+
+    columns_tmp = out_dir / (COLUMNS_FILE + '.tmp')
+    with open(columns_tmp, 'wb') as f:
+        np.save(f, columns)
+    os.replace(columns_tmp, out_dir / COLUMNS_FILE)
+    os.replace(proba_tmp, out_dir / PROBA_FILE)
+    os.replace(shap_tmp, out_dir / SHAP_FILE)
+
+    meta = {
+        "version": STORE_VERSION,
+        "n_rows": n_rows,
+        "n_features": len(analyzer.model_features),
+        "model_fingerprint": model_fingerprint,
+        "data_fingerprint": data_fingerprint,
+        # TreeExplainer only fills in expected_value once shap_values has run
+        "base_value": float(analyzer.explainer.expected_value),
+        "built_at": pd.Timestamp.now().isoformat()
+    }
+    meta_tmp = out_dir / (META_FILE + '.tmp')
+    with open(meta_tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_tmp, meta_path)
+
+    print(f"✅ SHAP store written to {out_dir}")
+    return meta
+
+
+class ShapStore:
+    """Read-only, memory-mapped view of a built SHAP store."""
+
+    def __init__(self, meta, proba, shap_values, columns):
+        self.meta = meta
+        self.proba = proba
+        self.shap_values = shap_values
+        self.columns = columns
+        self.n_features = meta['n_features']
+        self.base_value = meta['base_value']
+
+    @classmethod
+    def open(cls, directory, model_fingerprint, data_fingerprint, n_rows):
+        """Open the store, or return None if it is missing or was built from other inputs."""
+        directory = Path(directory)
+        meta_path = directory / META_FILE
+        if not meta_path.exists():
+            print(f"ℹ️  No SHAP store at {directory}; known customers will be explained live.")
+            print("   Build one with: python backend/api/shap_store.py")
+            return None
+
+        meta = cls._read_meta(meta_path)
+        if meta is None:
+            print(f"⚠️  SHAP store at {directory} is being rebuilt; known customers will be explained live.")
+            return None
+
+        stale = (
+            meta.get('version') != STORE_VERSION
+            or meta.get('model_fingerprint') != model_fingerprint
+            or meta.get('data_fingerprint') != data_fingerprint
+            or meta.get('n_rows') != n_rows
+        )
+        if stale:
+            print(f"⚠️  SHAP store at {directory} was built from a different model or data file; ignoring it.")
+            return None
+
+        proba = np.load(directory / PROBA_FILE, mmap_mode='r')
+        shap_values = np.load(directory / SHAP_FILE, mmap_mode='r')
+        columns = np.load(directory / COLUMNS_FILE)
+
+        # A rebuild may have replaced the data files after meta was read
+        consistent = (
+            cls._read_meta(meta_path) == meta
+            and proba.shape == (n_rows, 2)
+            and shap_values.shape == (n_rows, len(columns))
+        )
+        if not consistent:
+            print(f"⚠️  SHAP store at {directory} changed while it was opened; known customers will be explained live.")
+            return None
+        print(f"📦 Opened SHAP store with {meta['n_rows']} customers")
+        return cls(meta, proba, shap_values, columns)
+
+    @staticmethod
+    def _read_meta(meta_path):
+        """meta.json contents, or None if a rebuild has removed it."""
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def __len__(self):
+        return self.meta['n_rows']
+
+    def prediction(self, position):
+        """predict_proba output for the customer at `position`."""
+        return np.asarray(self.proba[position])
+
+    def shap_row(self, position):
+        """Full-width SHAP vector for the customer at `position`."""
+        row = np.zeros(self.n_features, dtype=np.float32)
+        row[self.columns] = self.shap_values[position]
+        return row
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Precompute predictions and SHAP values for company_data")
+    p.add_argument("--outdir", default=None, help="Store directory (defaults to the API's SHAP_STORE_DIR)")
+    p.add_argument("--chunk-size", type=int, default=5000, help="Rows explained per block")
+    return p.parse_args()
+
+
+def main():
+    import joblib
+    import shap
+
+    import api_server
+
+    args = parse_args()
+    out_dir = args.outdir or api_server.SHAP_STORE_DIR
+
+    print(f"Loading model from {api_server.MODEL_FILENAME}...")
+    model = joblib.load(api_server.MODEL_FILENAME)
+    explainer = shap.TreeExplainer(model)
+    analyzer = api_server.ShapDashboardAnalyzer(model, explainer, model.get_booster().feature_names)
+
+    print(f"Loading data from {api_server.COMPANY_DATA_FILENAME}...")
+    data = pd.read_csv(api_server.COMPANY_DATA_FILENAME)
+
+    build_shap_store(
+        analyzer, data, out_dir,
+        model_fingerprint=file_fingerprint(api_server.MODEL_FILENAME),
+        data_fingerprint=file_fingerprint(api_server.COMPANY_DATA_FILENAME),
+        chunk_size=args.chunk_size
+    )
+
+
+if __name__ == "__main__":
+    main()
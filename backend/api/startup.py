@@ -0,0 +1,73 @@
+"""
+Startup stage tracking for background initialization.
+
+initialize_analyzer loads the model, company data, explainer and SHAP store as
+separate stages, running independent ones in parallel, while the HTTP listener
+is already accepting requests. Each stage records its state and duration here,
+so /api/health can report liveness (the process answers) separately from
+readiness (every stage loaded).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class StartupStages:
+    """Thread-safe status and timing of named startup stages."""
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Mark every stage pending and start the startup clock."""
+        with self._lock:
+            self._stages = {name: {"status": PENDING, "seconds": None} for name in self.names}
+            self._started = time.perf_counter()
+            self._finished = None
+
+    @contextmanager
+    def stage(self, name):
+        """Run the enclosed block as stage `name`, recording its duration and outcome."""
+        self._update(name, status=LOADING)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._update(name, status=FAILED, seconds=round(time.perf_counter() - start, 3), error=str(e))
+            raise
+        seconds = time.perf_counter() - start
+        self._update(name, status=READY, seconds=round(seconds, 3))
+        print(f"⏱️  Startup stage '{name}' ready in {seconds:.2f}s")
+
+    def finish(self):
+        """Stop the startup clock, once every stage has either loaded or failed."""
+        with self._lock:
+            self._finished = time.perf_counter()
+            return self._finished - self._started
+
+    @property
+    def ready(self):
+        with self._lock:
+            return all(stage['status'] == READY for stage in self._stages.values())
+
+    def snapshot(self):
+        """Per-stage status for /api/health."""
+        with self._lock:
+            end = self._finished if self._finished is not None else time.perf_counter()
+            return {
+                "complete": self._finished is not None,
+                "elapsed_seconds": round(end - self._started, 3),
+                "stages": {name: dict(stage) for name, stage in self._stages.items()}
+            }
+
+    def _update(self, name, **fields):
+        with self._lock:
+            self._stages[name] = fields
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Compiled tree-ensemble evaluator for churn scoring without XGBoost.
+
+The booster is exported once into flat node arrays: for every node of every
+tree, its split feature, threshold, left/right child (-1 at leaves), the
+direction missing values take, and its leaf value, with each tree's root
+position. A numba kernel walks each row through every tree. It reproduces
+XGBoost's own arithmetic:
+- splits go left on `x < threshold`, and missing values take the default
+  direction;
+- leaf values are accumulated in float32 onto the base margin, in tree
+  order;
+- the margin goes through XGBoost's float32 sigmoid.
+So predict_proba matches XGBClassifier.predict_proba bit for bit. verify()
+checks this, and the server falls back to XGBoost if it ever does not hold.
+
+The arrays, with the model's feature names, can be saved to an .npz file.
+Loading that needs neither XGBoost nor the pickled sklearn wrapper: the API
+serves /api/score from the export while the pickled model, explainer and
+the rest of the analyzer are still loading. The export is checked against
+predict_proba when it is written.
+
+Export (and check) the model:
+    python backend/api/tree_ensemble.py
+"""
+
+import argparse
+import json
+import math
+
+import numpy as np
+from numba import njit
+
+ENSEMBLE_VERSION = 2
+
+_ONE = np.float32(1.0)
+# XGBoost's common::Sigmoid clamps the exponent and adds this to the denominator
+_SIGMOID_MAX_EXP = np.float32(88.7)
+_SIGMOID_EPS = np.float32(1e-16)
+
+
+@njit(nogil=True, cache=True)
+def _predict_margin(X, roots, feature, threshold, left, right, default_left, value, base_margin, out):
+    for i in range(X.shape[0]):
+        margin = base_margin
+        for t in range(roots.shape[0]):
+            node = roots[t]
+            while left[node] != -1:
+                x = X[i, feature[node]]
+                if np.isnan(x):
+                    node = left[node] if default_left[node] else right[node]
+                elif x < threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            margin += value[node]
+        out[i] = margin
+
+
+@njit(nogil=True, cache=True)
+def _sigmoid(margin, out):
+    for i in range(margin.shape[0]):
+        x = min(-margin[i], _SIGMOID_MAX_EXP)
+        out[i] = _ONE / (math.exp(x) + _ONE + _SIGMOID_EPS)
+
+
+@njit(cache=True)
+def _prob_to_margin(base_score):
+    return -math.log(_ONE / base_score - _ONE)
+
+
+class TreeEnsemble:
+    """Flat-array copy of a binary:logistic XGBoost booster, evaluated with numba."""
+
+    def __init__(self, roots, feature, threshold, left, right, default_left, value, base_margin, n_features,
+                 feature_names=None):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.base_margin = np.float32(base_margin)
+        self.n_features = int(n_features)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    @classmethod
+    def from_booster(cls, booster, n_rounds=None):
+        """Compile the first n_rounds boosting rounds (default all) of a booster."""
+        model = json.loads(booster.save_raw(raw_format='json'))
+        learner = model['learner']
+        if learner['objective']['name'] != 'binary:logistic':
+            raise ValueError(f"Only binary:logistic models are supported, not {learner['objective']['name']}")
+        trees = learner['gradient_booster']['model']['trees']
+        if any(any(t.get('split_type', [])) for t in trees):
+            raise ValueError("Categorical splits are not supported")
+        if n_rounds is not None:
+            per_round = int(learner['gradient_booster']['model']['gbtree_model_param']['num_parallel_tree'])
+            trees = trees[:n_rounds * per_round]
+
+        sizes = np.array([len(t['left_children']) for t in trees], dtype=np.int32)
+        roots = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int32)
+
+        def flat(key, dtype):
+            return np.concatenate([np.asarray(t[key], dtype=dtype) for t in trees])
+
+        left = flat('left_children', np.int32)
+        right = flat('right_children', np.int32)
+        # Children are numbered within each tree; make them positions in the flat arrays
+        offsets = np.repeat(roots, sizes)
+        internal = left != -1
+        left[internal] += offsets[internal]
+        right[internal] += offsets[internal]
+
+        # Leaves keep their value in split_conditions
+        conditions = flat('split_conditions', np.float32)
+        base_score = np.float32(learner['learner_model_param']['base_score'])
+        return cls(
+            roots=roots,
+            feature=flat('split_indices', np.int32),
+            threshold=np.where(internal, conditions, np.float32(0)),
+            left=left,
+            right=right,
+            default_left=flat('default_left', np.bool_),
+            value=np.where(internal, np.float32(0), conditions),
+            base_margin=_prob_to_margin(base_score),
+            n_features=learner['learner_model_param']['num_feature'],
+            feature_names=booster.feature_names
+        )
+
+    @classmethod
+    def from_model(cls, model):
+        """Compile a fitted XGBClassifier, with the trees its predict_proba uses."""
+        try:
+            n_rounds = model.best_iteration + 1
+        except AttributeError:
+            n_rounds = None
+        return cls.from_booster(model.get_booster(), n_rounds)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict_margin(self, X):
+        """Raw scores (n,) float32 for an encoded (n, n_features) matrix."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected an (n, {self.n_features}) matrix, got shape {X.shape}")
+        out = np.empty(len(X), dtype=np.float32)
+        _predict_margin(X, self.roots, self.feature, self.threshold, self.left, self.right,
+                        self.default_left, self.value, self.base_margin, out)
+        return out
+
+    def predict(self, X):
+        """Churn probabilities (n,) float32, as booster.inplace_predict returns them."""
+        margin = self.predict_margin(X)
+        _sigmoid(margin, margin)
+        return margin
+
+    def predict_proba(self, X):
+        """(n, 2) class probabilities, as XGBClassifier.predict_proba returns them."""
+        churn_probability = self.predict(X)
+        return np.column_stack((1 - churn_probability, churn_probability))
+
+    def verify(self, model, X):
+        """True if predict_proba matches model.predict_proba exactly on the rows of X."""
+        X = np.asarray(X, dtype=np.float32)
+        return np.array_equal(self.predict_proba(X), model.predict_proba(X))
+
+    def save(self, path, model_fingerprint=None):
+        np.savez(
+            path, version=ENSEMBLE_VERSION, roots=self.roots, feature=self.feature,
+            threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, value=self.value,
+            base_margin=self.base_margin, n_features=self.n_features,
+            feature_names=np.array(self.feature_names or [], dtype=str),
+            model_fingerprint=model_fingerprint or ''
+        )
+
+    @classmethod
+    def load(cls, path, model_fingerprint=None):
+        """
+        Load a saved ensemble. With model_fingerprint, returns None if the file
+        was exported from a different model.
+        """
+        with np.load(path) as data:
+            if int(data['version']) != ENSEMBLE_VERSION:
+                return None
+            if model_fingerprint is not None and str(data['model_fingerprint']) != model_fingerprint:
+                return None
+            return cls(**{key: data[key] for key in (
+                'roots', 'feature', 'threshold', 'left', 'right', 'default_left', 'value'
+            )}, base_margin=data['base_margin'][()], n_features=data['n_features'][()],
+                feature_names=data['feature_names'].tolist() or None)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Export the churn model as a compiled tree ensemble")
+    p.add_argument("--output", default=None, help="Output .npz (defaults to the API's TREE_ENSEMBLE_FILENAME)")
+    p.add_argument("--rows", type=int, default=1000, help="Rows of company data checked against XGBoost")
+    return p.parse_args()
+
+
+def main():
+    import joblib
+    import pandas as pd
+
+    import api_server
+    from feature_encoder import FeatureEncoder
+    from fingerprint import file_fingerprint
+
+    args = parse_args()
+    output = args.output or api_server.TREE_ENSEMBLE_FILENAME
+
+    print(f"Loading model from {api_server.MODEL_FILENAME}...")
+    model = joblib.load(api_server.MODEL_FILENAME)
+    ensemble = TreeEnsemble.from_model(model)
+    print(f"🌲 Compiled {ensemble.n_trees} trees ({len(ensemble.left)} nodes)")
+
+    print(f"Checking against predict_proba on {args.rows} rows of {api_server.COMPANY_DATA_FILENAME}...")
+    encoder = FeatureEncoder(
+        model.get_booster().feature_names, api_server.CATEGORICAL_COLS, api_server.IDENTIFIER_COLS
+    )
+    X = encoder.encode_many(pd.read_csv(api_server.COMPANY_DATA_FILENAME, nrows=args.rows).to_dict('records'))
+    if not ensemble.verify(model, X):
+        raise SystemExit("❌ Compiled ensemble does not match predict_proba; not exported")
+
+    ensemble.save(output, model_fingerprint=file_fingerprint(api_server.MODEL_FILENAME))
+    print(f"💾 Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
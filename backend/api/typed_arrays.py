@@ -0,0 +1,79 @@
+"""
+Compact binary framing for bulk prediction and SHAP results.
+
+A payload is a sequence of frames, one per streamed chunk of customers:
+
+    MAGIC (8 bytes) | header length (uint32, little-endian) | header (UTF-8 JSON)
+    | array data
+
+The header is padded with spaces so the array data starts on an 8-byte
+boundary, and each array is padded to 8 bytes, as is the frame. Arrays are
+raw little-endian C-order buffers; the header lists each one's name, dtype,
+shape and offset (relative to the start of the array data), plus any metadata
+the endpoint adds. Clients can wrap the buffers without copying, e.g.
+`new Float32Array(buffer, dataStart + offset, rows * cols)` in the browser or
+np.frombuffer in Python (see decode_frames).
+"""
+
+import json
+import struct
+
+import numpy as np
+
+MIMETYPE = 'application/vnd.churn.typed-arrays'
+MAGIC = b'CHURNTA1'
+ALIGNMENT = 8
+
+_LENGTH = struct.Struct('<I')
+
+
+def encode_frame(arrays, dumps=json.dumps, **meta):
+    """
+    Serialize {name: ndarray} plus JSON-serializable metadata as one frame.
+    `dumps` is the JSON encoder used for the header.
+    """
+    specs, blobs, offset = [], [], 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=np.asarray(array).dtype.newbyteorder('<'))
+        data = array.tobytes()
+        specs.append({
+            "name": name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset
+        })
+        blobs.append(data + b'\0' * _padding(len(data)))
+        offset += len(blobs[-1])
+
+    header = dumps({**meta, "arrays": specs, "data_length": offset}).encode('utf-8')
+    header += b' ' * _padding(len(MAGIC) + _LENGTH.size + len(header))
+    return b''.join([MAGIC, _LENGTH.pack(len(header)), header, *blobs])
+
+
+def decode_frames(payload):
+    """Parse a payload into a list of (header, {name: ndarray}) frames."""
+    frames, position = [], 0
+    view = memoryview(payload)
+    while position < len(payload):
+        if bytes(view[position:position + len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Bad frame magic at byte {position}")
+        position += len(MAGIC)
+        (header_length,) = _LENGTH.unpack_from(view, position)
+        position += _LENGTH.size
+        header = json.loads(bytes(view[position:position + header_length]))
+        position += header_length
+
+        arrays = {}
+        for spec in header['arrays']:
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape'], dtype=np.int64))
+            arrays[spec['name']] = np.frombuffer(
+                view, dtype=dtype, count=count, offset=position + spec['offset']
+            ).reshape(spec['shape'])
+        position += header['data_length']
+        frames.append((header, arrays))
+    return frames
+
+
+def _padding(length):
+    return -length % ALIGNMENT
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The API modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api'))
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+
+@pytest.fixture(scope='session')
+def customers():
+    """Small sample of company_data-shaped rows, with missing values."""
+    return pd.read_csv(FIXTURES_DIR / 'customers.csv')
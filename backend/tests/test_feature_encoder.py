@@ -0,0 +1,74 @@
+"""FeatureEncoder must encode exactly like the pandas get_dummies/reindex path it replaced."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import api_server
+from feature_encoder import FeatureEncoder
+
+
+@pytest.fixture(scope='module')
+def model_features(customers):
+    features = customers.drop(columns=api_server.IDENTIFIER_COLS + ['Churn'])
+    categorical = [col for col in api_server.CATEGORICAL_COLS if col in features.columns]
+    names = list(pd.get_dummies(features, columns=categorical).columns)
+    # A column the raw data never produces stays 0
+    return names + ['marital_status_Widowed']
+
+
+@pytest.fixture(scope='module')
+def encoder(model_features):
+    return FeatureEncoder(model_features, api_server.CATEGORICAL_COLS, api_server.IDENTIFIER_COLS)
+
+
+def pandas_path(model_features, customers):
+    analyzer = SimpleNamespace(model_features=model_features)
+    frame = api_server.ShapDashboardAnalyzer.encode_frame(analyzer, pd.DataFrame(customers))
+    return frame.to_numpy(dtype=np.float64)
+
+
+def assert_parity(model_features, encoder, customers):
+    expected = pandas_path(model_features, customers)
+    assert np.array_equal(encoder.encode_many(customers, dtype=np.float64), expected, equal_nan=True)
+    assert np.array_equal(encoder.encode_many(customers), expected.astype(np.float32), equal_nan=True)
+    for i, customer in enumerate(customers):
+        assert np.array_equal(encoder.encode(customer, dtype=np.float64)[0], expected[i], equal_nan=True)
+
+
+def test_fixture_rows(model_features, encoder, customers):
+    rows = customers.drop(columns=['Churn']).to_dict('records')
+    assert any(pd.isna(value) for row in rows for value in row.values())
+    assert_parity(model_features, encoder, rows)
+
+
+@pytest.mark.parametrize('changes', [
+    {'city': 'Austin', 'county': 'Travis'},
+    {'marital_status': np.nan, 'home_market_value': None},
+    {'age_in_years': np.nan, 'length_of_residence': None},
+    {'income': '45000', 'days_tenure': '1200'},
+    {'has_children': '1', 'curr_ann_amt': '812.5'},
+    {'favourite_colour': 'green', 'Churn': 1, 'notes': None},
+], ids=['unseen_categories', 'missing_categories', 'missing_numbers', 'numeric_strings',
+        'numeric_strings_decimal', 'extra_keys'])
+def test_edge_cases(model_features, encoder, customers, changes):
+    base = customers.drop(columns=['Churn']).iloc[0].to_dict()
+    customer = {**base, **changes}
+    assert_parity(model_features, encoder, [customer])
+
+
+def test_absent_fields_stay_zero(model_features, encoder):
+    customer = {'individual_id': 1, 'city': 'Plano', 'income': 70000.0}
+    assert_parity(model_features, encoder, [customer])
+    row = encoder.encode(customer)[0]
+    assert np.count_nonzero(row) == 2
+
+
+def test_assign_matches_reencoding(model_features, encoder, customers):
+    rows = customers.drop(columns=['Churn']).head(4).to_dict('records')
+    values = ['Arlington', 'Austin', np.nan, 'Dallas']
+    matrix = encoder.assign(encoder.encode_many(rows, dtype=np.float64), 'city', values)
+    edited = [{**row, 'city': value} for row, value in zip(rows, values)]
+    assert np.array_equal(matrix, pandas_path(model_features, edited), equal_nan=True)
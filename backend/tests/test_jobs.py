@@ -0,0 +1,67 @@
+"""JobRunner keeps a bounded number of finished jobs."""
+
+import time
+
+import pytest
+
+from jobs import FAILED, SUCCEEDED, JobRunner
+
+
+def wait(runner, job):
+    deadline = time.time() + 10
+    while not job.finished:
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def runner():
+    return JobRunner(max_workers=1, retention_seconds=3600, max_pending=4, max_retained=3,
+                     fetched_retention_seconds=0.05)
+
+
+def test_oldest_finished_jobs_are_dropped(runner):
+    jobs = []
+    for i in range(6):
+        job, created = runner.submit('test', f'key-{i}', lambda progress, i=i: {"n": i})
+        assert created
+        wait(runner, job)
+        jobs.append(job)
+    kept = [job for job in jobs if runner.get(job.id) is not None]
+    assert kept == jobs[-3:]
+    assert sum(runner.stats().values()) == 3
+
+
+def test_fetched_result_expires_after_grace_period(runner):
+    job, _ = runner.submit('test', 'key', lambda progress: [1, 2, 3])
+    wait(runner, job)
+    assert runner.get(job.id).status == SUCCEEDED
+    runner.fetched(job)
+    assert runner.get(job.id) is job
+    time.sleep(0.1)
+    assert runner.get(job.id) is None
+
+
+def test_duplicate_submit_joins_active_job(runner):
+    release = []
+
+    def slow(progress):
+        while not release:
+            time.sleep(0.001)
+        return "done"
+
+    job, created = runner.submit('test', 'same', slow)
+    again, created_again = runner.submit('test', 'same', slow)
+    assert created and not created_again and again is job
+    release.append(True)
+    wait(runner, job)
+    assert job.result == "done"
+
+
+def test_failed_job_keeps_error(runner):
+    def fail(progress):
+        raise ValueError("boom")
+
+    job, _ = runner.submit('test', 'bad', fail)
+    wait(runner, job)
+    assert job.status == FAILED and job.error == "boom"
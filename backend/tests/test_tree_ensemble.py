@@ -0,0 +1,111 @@
+"""TreeEnsemble must reproduce XGBClassifier.predict_proba bit for bit."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+import api_server
+from feature_encoder import FeatureEncoder
+from tree_ensemble import TreeEnsemble
+
+
+@pytest.fixture(scope='module')
+def training_data(customers):
+    features = customers.drop(columns=api_server.IDENTIFIER_COLS + ['Churn'])
+    categorical = [col for col in api_server.CATEGORICAL_COLS if col in features.columns]
+    X = pd.get_dummies(features, columns=categorical).astype(np.float32)
+    return X, customers['Churn']
+
+
+@pytest.fixture(scope='module')
+def model(training_data):
+    """Small fixture model; the fixture's missing values give it learned default directions."""
+    X, y = training_data
+    return xgb.XGBClassifier(
+        n_estimators=40, max_depth=4, learning_rate=0.3, base_score=0.4, min_child_weight=0,
+        random_state=0, n_jobs=1
+    ).fit(X, y)
+
+
+@pytest.fixture(scope='module')
+def matrix(training_data, model):
+    """Fixture rows, the same rows with missing split values, and rows sitting exactly on thresholds."""
+    X = training_data[0].to_numpy(dtype=np.float32)
+    ensemble = TreeEnsemble.from_model(model)
+    internal = ensemble.left != -1
+    rng = np.random.default_rng(0)
+
+    with_missing = X.copy()
+    used = np.unique(ensemble.feature[internal])
+    mask = rng.random((len(X), len(used))) < 0.3
+    block = with_missing[:, used]
+    block[mask] = np.nan
+    with_missing[:, used] = block
+
+    all_missing = np.full((1, X.shape[1]), np.nan, dtype=np.float32)
+
+    on_threshold = np.repeat(X[:1], internal.sum(), axis=0)
+    on_threshold[np.arange(internal.sum()), ensemble.feature[internal]] = ensemble.threshold[internal]
+
+    return np.vstack([X, with_missing, all_missing, on_threshold])
+
+
+def test_model_uses_both_default_directions(model):
+    ensemble = TreeEnsemble.from_model(model)
+    internal = ensemble.left != -1
+    assert set(ensemble.default_left[internal].tolist()) == {True, False}
+
+
+def test_predict_proba_matches_xgboost(model, matrix):
+    ensemble = TreeEnsemble.from_model(model)
+    assert np.isnan(matrix).any()
+    assert np.array_equal(ensemble.predict_proba(matrix), model.predict_proba(matrix))
+    assert ensemble.verify(model, matrix)
+
+
+def test_margin_matches_xgboost(model, matrix):
+    ensemble = TreeEnsemble.from_model(model)
+    expected = model.get_booster().inplace_predict(matrix, predict_type='margin')
+    assert np.array_equal(ensemble.predict_margin(matrix), expected)
+
+
+def test_predict_matches_inplace_predict(model, matrix):
+    ensemble = TreeEnsemble.from_model(model)
+    assert np.array_equal(ensemble.predict(matrix), model.get_booster().inplace_predict(matrix))
+
+
+def test_best_iteration_limits_trees(training_data, matrix):
+    X, y = training_data
+    model = xgb.XGBClassifier(
+        n_estimators=200, max_depth=3, learning_rate=0.5, early_stopping_rounds=3, random_state=0, n_jobs=1
+    ).fit(X[:40], y[:40], eval_set=[(X[40:], y[40:])], verbose=False)
+    ensemble = TreeEnsemble.from_model(model)
+    assert ensemble.n_trees == model.best_iteration + 1 < 200
+    assert np.array_equal(ensemble.predict_proba(matrix), model.predict_proba(matrix))
+
+
+def test_save_and_load(tmp_path, model, matrix):
+    ensemble = TreeEnsemble.from_model(model)
+    path = tmp_path / 'model.trees.npz'
+    ensemble.save(path, model_fingerprint='abc')
+
+    loaded = TreeEnsemble.load(path, model_fingerprint='abc')
+    assert loaded.feature_names == model.get_booster().feature_names
+    assert np.array_equal(loaded.predict_proba(matrix), model.predict_proba(matrix))
+    assert TreeEnsemble.load(path, model_fingerprint='other') is None
+
+
+def test_wrong_width_is_rejected(model):
+    ensemble = TreeEnsemble.from_model(model)
+    with pytest.raises(ValueError):
+        ensemble.predict(np.zeros((1, ensemble.n_features + 1), dtype=np.float32))
+
+
+def test_scores_encoded_customers_like_xgboost(model, customers):
+    ensemble = TreeEnsemble.from_model(model)
+    encoder = FeatureEncoder(model.get_booster().feature_names, api_server.CATEGORICAL_COLS,
+                             api_server.IDENTIFIER_COLS)
+    rows = customers.to_dict('records') + [{'city': 'Austin', 'income': '45000', 'days_tenure': None}]
+    X = encoder.encode_many(rows)
+    assert np.array_equal(ensemble.predict_proba(X), model.predict_proba(X))